@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import subprocess
+import statistics
+
+# Measures how long a fresh interpreter takes to import the web app (what gunicorn
+# pays on every cold start), and what linking the bot (importing discord.py) adds.
+RUNS = 5
+SCENARIOS = [
+    ('snapshot', 'snapshot', 'import src.web_app'),
+    ('combined', 'combined', 'import src.web_app'),
+    ('combined + bot linked', 'combined', 'import src.web_app; src.web_app.get_bot()'),
+]
+
+def time_startup(mode, code):
+    """Return the wall time in seconds of running code in a new process"""
+    env = dict(os.environ, SERVE_MODE=mode)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def slowest_imports(mode, code, limit=10):
+    """Return the slowest modules reported by python -X importtime"""
+    env = dict(os.environ, SERVE_MODE=mode)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            env=env, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        # Lines look like "import time:   self_us | cumulative_us | module"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), name.rstrip()))
+    return sorted(rows, reverse=True)[:limit]
+
+def main():
+    print("=== Web App Startup Time ===")
+    for label, mode, code in SCENARIOS:
+        samples = [time_startup(mode, code) for _ in range(RUNS)]
+        print(f"{label:>22}: median {statistics.median(samples) * 1000:.0f} ms "
+              f"(min {min(samples) * 1000:.0f} ms, max {max(samples) * 1000:.0f} ms, {RUNS} runs)")
+    
+    for label, mode, code in SCENARIOS:
+        print(f"\n=== Slowest Imports ({label}) ===")
+        for cumulative_us, name in slowest_imports(mode, code):
+            print(f"{cumulative_us / 1000:8.1f} ms  {name}")
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from discord.ext import commands
 from dotenv import load_dotenv
 import json
 from datetime import datetime
+from src.shards import shard_options
 
 # Load environment variables
 load_dotenv()
@@ -14,8 +15,12 @@ intents = discord.Intents.default()
 intents.members = True  # Need this to access member information
 intents.message_content = True  # Need this to read message content
 
-# Create bot instance
-bot = commands.Bot(command_prefix='!', intents=intents)
+# Create bot instance; SHARDED, SHARD_COUNT or SHARD_IDS split the gateway across several connections
+sharding = shard_options()
+if sharding is None:
+    bot = commands.Bot(command_prefix='!', intents=intents)
+else:
+    bot = commands.AutoShardedBot(command_prefix='!', intents=intents, **sharding)
 
 @bot.event
 async def on_ready():
@@ -1,31 +1,28 @@
-import requests
-import json
-import time
-import os
+import sys
+import asyncio
 from datetime import datetime
+from src.verify_client import VerificationClient, print_counts
 
 # Configuration
 RENDER_API_URL = "https://discord-to-site-api.onrender.com"
 
-def check_api_health():
+async def check_api_health(client):
     """Check if the API is healthy and get detailed information"""
     try:
-        response = requests.get(f"{RENDER_API_URL}/api/health")
-        print(f"API Health Status Code: {response.status_code}")
+        status, data = await client.health()
+        print(f"API Health Status Code: {status}")
         
-        if response.status_code == 200:
-            data = response.json()
+        if status == 200:
             print(f"API Status: {data.get('status')}")
             print(f"Bot Running: {data.get('bot_running')}")
             print(f"Export Directory Exists: {data.get('export_dir_exists')}")
             
-            export_files = data.get('export_files', [])
-            print(f"Export Files Count: {len(export_files)}")
+            print(f"Export Files Count: {data.get('file_count', 0)}")
             
-            if export_files:
-                print("Export Files:")
-                for file in export_files:
-                    print(f"  - {file}")
+            snapshot = data.get('snapshot')
+            if snapshot:
+                print(f"Latest Snapshot: {snapshot.get('id')} ({snapshot.get('age_seconds')}s old)")
+                print(f"Last Export Duration: {snapshot.get('export_duration_seconds')}s")
             else:
                 print("No export files found")
                 
@@ -35,141 +32,107 @@ def check_api_health():
         print(f"Error checking API health: {e}")
         return None
 
-def trigger_export():
+async def trigger_export(client):
     """Trigger a Discord data export on Render"""
     try:
         print("\n=== Triggering Export ===")
-        response = requests.post(f"{RENDER_API_URL}/api/trigger_export")
-        print(f"Trigger Export Status Code: {response.status_code}")
+        status, data = await client.trigger_export()
+        print(f"Trigger Export Status Code: {status}")
         
-        if response.status_code == 200:
-            data = response.json()
+        if status == 200:
             print(f"Status: {data.get('status')}")
             print(f"Message: {data.get('message')}")
             return True
         else:
-            print(f"Failed to trigger export: {response.text}")
+            print(f"Failed to trigger export: {data}")
             return False
     except Exception as e:
         print(f"Error triggering export: {e}")
         return False
 
-def check_summary():
-    """Check if a summary file exists"""
-    try:
-        print("\n=== Checking Summary ===")
-        response = requests.get(f"{RENDER_API_URL}/api/summary")
-        print(f"Summary Status Code: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            if "error" in data:
-                print(f"Error: {data.get('error')}")
-                print(f"Status: {data.get('status')}")
-                return False
-            
-            print(f"Server Name: {data.get('server_name')}")
-            print(f"Export Time: {data.get('export_time')}")
-            
-            if "files" in data:
-                print("Files:")
-                for key, value in data.get('files', {}).items():
-                    print(f"  - {key}: {value}")
-            
-            return True
-        else:
-            print(f"Failed to get summary: {response.text}")
-            return False
-    except Exception as e:
-        print(f"Error checking summary: {e}")
+def report_summary(status, data):
+    """Print the result of a summary check"""
+    print("\n=== Checking Summary ===")
+    print(f"Summary Status Code: {status}")
+    
+    if status != 200 or not data:
+        print(f"Failed to get summary: {data}")
         return False
+    
+    if "error" in data:
+        print(f"Error: {data.get('error')}")
+        print(f"Status: {data.get('status')}")
+        return False
+    
+    print(f"Server Name: {data.get('server_name')}")
+    print(f"Export Time: {data.get('export_time')}")
+    
+    if "files" in data:
+        print("Files:")
+        for key, value in data.get('files', {}).items():
+            print(f"  - {key}: {value}")
+    
+    return True
 
-def check_data():
-    """Check if the API is returning data"""
-    try:
-        print("\n=== Checking All Data ===")
-        response = requests.get(f"{RENDER_API_URL}/api/all")
-        print(f"Data Check Status Code: {response.status_code}")
-        
-        if response.status_code != 200:
-            print(f"Error: {response.status_code} - {response.text}")
-            return False
-        
-        data = response.json()
-        
-        if "error" in data:
-            print(f"Error: {data.get('error')}")
-            print(f"Status: {data.get('status')}")
-            return False
-        
-        # Print a summary of the data
-        if "summary" in data:
-            print(f"Server: {data['summary'].get('server_name')}")
-            print(f"Export time: {data['summary'].get('export_time')}")
-        
-        if "members" in data and isinstance(data["members"], list):
-            print(f"Members: {len(data['members'])}")
-        
-        if "channels" in data and isinstance(data["channels"], list):
-            print(f"Channels: {len(data['channels'])}")
-        
-        if "roles" in data and isinstance(data["roles"], list):
-            print(f"Roles: {len(data['roles'])}")
-        
-        return True
-    except Exception as e:
-        print(f"Error checking data: {e}")
+def report_counts(status, data):
+    """Print the result of a data check"""
+    print("\n=== Checking All Data ===")
+    print(f"Data Check Status Code: {status}")
+    
+    if status != 200 or not data:
+        print(f"Error: {status} - {data}")
         return False
+    
+    if "error" in data:
+        print(f"Error: {data.get('error')}")
+        print(f"Status: {data.get('status')}")
+        return False
+    
+    print_counts(data)
+    return True
 
-def main():
+async def main(url):
     """Main function"""
     print("=== Discord Export Debugging Tool ===")
-    print(f"Target API: {RENDER_API_URL}")
+    print(f"Target API: {url}")
     print(f"Current Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Step 1: Check API health
-    print("\n=== Step 1: Checking API Health ===")
-    health_data = check_api_health()
-    
-    if not health_data:
-        print("API health check failed")
-        return
-    
-    # Step 2: Trigger export
-    print("\n=== Step 2: Triggering Export ===")
-    if not trigger_export():
-        print("Failed to trigger export")
-        return
-    
-    # Step 3: Wait and check for data
-    print("\n=== Step 3: Waiting for Export to Complete ===")
-    max_attempts = 10
-    wait_time = 10  # seconds
-    
-    for attempt in range(1, max_attempts + 1):
-        print(f"\nAttempt {attempt}/{max_attempts} - Waiting {wait_time} seconds...")
-        time.sleep(wait_time)
+    async with VerificationClient(url) as client:
+        # Step 1: Check API health
+        print("\n=== Step 1: Checking API Health ===")
+        health_data = await check_api_health(client)
         
-        # Check health again to see if files have been created
-        health_data = check_api_health()
+        if not health_data:
+            print("API health check failed")
+            return
         
-        if health_data and health_data.get('export_files'):
-            print("Export files detected!")
-            break
-    
-    # Step 4: Check summary
-    print("\n=== Step 4: Checking Summary ===")
-    summary_exists = check_summary()
-    
-    # Step 5: Check all data
-    print("\n=== Step 5: Checking All Data ===")
-    data_exists = check_data()
+        status, counts = await client.counts()
+        previous_export = counts.get('export_time') if status == 200 and counts else None
+        
+        # Step 2: Trigger export
+        print("\n=== Step 2: Triggering Export ===")
+        if not await trigger_export(client):
+            print("Failed to trigger export")
+            return
+        
+        # Step 3: Wait for a new export, backing off between polls
+        print("\n=== Step 3: Waiting for Export to Complete ===")
+        if await client.wait_for_data(timeout=100, since=previous_export):
+            print("New export detected!")
+        else:
+            print("No new export detected, checking the latest data anyway")
+        
+        # Steps 4 and 5: Check summary and data together
+        print("\n=== Steps 4-5: Checking Summary and Data ===")
+        results = await client.check_all()
+        health_data = results['health'][1] if not isinstance(results['health'], Exception) else None
+        summary_exists = not isinstance(results['summary'], Exception) and report_summary(*results['summary'])
+        data_exists = not isinstance(results['counts'], Exception) and report_counts(*results['counts'])
     
     # Final report
     print("\n=== Final Report ===")
     print(f"API Health: {'OK' if health_data else 'FAILED'}")
-    print(f"Export Files: {len(health_data.get('export_files', [])) if health_data else 0}")
+    print(f"Export Files: {health_data.get('file_count', 0) if health_data else 0}")
     print(f"Summary Exists: {'YES' if summary_exists else 'NO'}")
     print(f"Data Available: {'YES' if data_exists else 'NO'}")
     
@@ -182,4 +145,5 @@ def main():
         print("5. Make sure the server_data directory is writable")
 
 if __name__ == "__main__":
-    main()
+    # Pass --local to run against the Flask app in this process
+    asyncio.run(main('local' if '--local' in sys.argv else RENDER_API_URL))
@@ -1,25 +1,27 @@
 import os
 import json
+import asyncio
 import requests
-import time
 from datetime import datetime
+from upload_to_render import sync_snapshot
+from src.verify_client import VerificationClient, print_counts
 
 # Configuration
 RENDER_API_URL = "https://discord-to-site-api.onrender.com"
 LOCAL_SERVER_DATA_DIR = "server_data"
 
-def check_api_health():
+async def check_api_health(client):
     """Check if the API is healthy"""
     try:
-        response = requests.get(f"{RENDER_API_URL}/api/health")
-        print(f"API Health: {response.status_code}")
-        if response.status_code == 200:
-            data = response.json()
+        status, data = await client.health()
+        print(f"API Health: {status}")
+        if status == 200:
             print(f"API Status: {data.get('status')}")
             print(f"Bot Running: {data.get('bot_running')}")
             print(f"Export Directory Exists: {data.get('export_dir_exists')}")
-            export_files = data.get('export_files', [])
-            print(f"Export Files: {export_files}")
+            print(f"Export Files: {data.get('file_count', 0)}")
+            snapshot = data.get('snapshot')
+            print(f"Latest Snapshot: {snapshot.get('id') if snapshot else None}")
             return data
         return None
     except Exception as e:
@@ -103,7 +105,18 @@ def create_manual_export_files():
     return upload_files_to_render(files_dict, summary_path)
 
 def upload_files_to_render(files_dict, summary_path):
-    """Upload files to Render"""
+    """Sync files to Render, sending only what the server is missing"""
+    print("\n=== Syncing Files to Render ===")
+    
+    # The summary is published last by the server, so the snapshot appears atomically
+    if sync_snapshot(list(files_dict.values()) + [summary_path], api_url=RENDER_API_URL):
+        return True
+    
+    print("Sync failed, falling back to per-file uploads")
+    return upload_files_individually(files_dict, summary_path)
+
+def upload_files_individually(files_dict, summary_path):
+    """Upload files to Render one request at a time"""
     print("\n=== Uploading Files to Render ===")
     
     # Create the server_data directory on Render
@@ -161,43 +174,19 @@ def upload_files_to_render(files_dict, summary_path):
     print(f"Successfully uploaded {success_count} out of {total_files} files")
     return success_count == total_files
 
-def check_data():
-    """Check if the API is returning data"""
-    try:
-        print("\n=== Checking Data ===")
-        response = requests.get(f"{RENDER_API_URL}/api/all")
-        print(f"Data check: {response.status_code}")
-        
-        if response.status_code != 200:
-            print(f"Error: {response.status_code} - {response.text}")
-            return False
-        
-        data = response.json()
-        
-        if "error" in data and data.get("status") == "waiting_for_data":
-            print("No data available yet")
-            return False
-        
-        # Print a summary of the data
-        if "summary" in data:
-            print(f"Server: {data['summary'].get('server_name')}")
-            print(f"Export time: {data['summary'].get('export_time')}")
-        
-        if "members" in data and isinstance(data["members"], list):
-            print(f"Members: {len(data['members'])}")
-        
-        if "channels" in data and isinstance(data["channels"], list):
-            print(f"Channels: {len(data['channels'])}")
-        
-        if "roles" in data and isinstance(data["roles"], list):
-            print(f"Roles: {len(data['roles'])}")
-        
-        return True
-    except Exception as e:
-        print(f"Error checking data: {e}")
+async def check_data(client):
+    """Wait until the API reports data, backing off between polls"""
+    print("\n=== Checking Data ===")
+    data = await client.wait_for_data(timeout=60, initial_delay=2)
+    
+    if not data:
+        print("No data available yet")
         return False
+    
+    print_counts(data)
+    return True
 
-def main():
+async def main():
     """Main function"""
     print("=== Discord Export Fix Tool ===")
     print(f"Target API: {RENDER_API_URL}")
@@ -205,30 +194,23 @@ def main():
     
     # Step 1: Check API health
     print("\n=== Step 1: Checking API Health ===")
-    health_data = check_api_health()
-    
-    if not health_data:
-        print("API health check failed")
-        return
-    
-    # Step 2: Create and upload manual export files
-    print("\n=== Step 2: Creating and Uploading Manual Export Files ===")
-    if not create_manual_export_files():
-        print("Failed to create and upload manual export files")
-        return
-    
-    # Step 3: Check if data is available
-    print("\n=== Step 3: Checking if Data is Available ===")
-    max_attempts = 5
-    wait_time = 5  # seconds
-    
-    for attempt in range(1, max_attempts + 1):
-        print(f"\nAttempt {attempt}/{max_attempts} - Waiting {wait_time} seconds...")
-        time.sleep(wait_time)
+    async with VerificationClient(RENDER_API_URL) as client:
+        health_data = await check_api_health(client)
+        
+        if not health_data:
+            print("API health check failed")
+            return
+        
+        # Step 2: Create and upload manual export files
+        print("\n=== Step 2: Creating and Uploading Manual Export Files ===")
+        if not await asyncio.to_thread(create_manual_export_files):
+            print("Failed to create and upload manual export files")
+            return
         
-        if check_data():
+        # Step 3: Check if data is available
+        print("\n=== Step 3: Checking if Data is Available ===")
+        if await check_data(client):
             print("Data is available!")
-            break
     
     print("\n=== Export Fix Complete ===")
     print("If you're still having issues, please check the following:")
@@ -237,4 +219,4 @@ def main():
     print("3. Check the server logs for any errors")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
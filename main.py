@@ -1,17 +1,40 @@
 import asyncio
 import os
+import sys
+import subprocess
 import discord
 from discord.ext import commands
 import threading
-from src.config import DISCORD_TOKEN, COMMAND_PREFIX
+from src.config import DISCORD_TOKEN, COMMAND_PREFIX, BOT_IPC_SOCKET, DEFAULT_BOT_IPC_SOCKET, PRESENCE_TRACKING, MEMBER_CACHE
+from src.shards import shard_options
 
 # Set up intents (permissions)
 intents = discord.Intents.default()
 intents.members = True  # Need this to access member information
 intents.message_content = True  # Need this to read message content
+intents.presences = PRESENCE_TRACKING  # Privileged; needed for member status and presence events
 
-# Create bot instance
-bot = commands.Bot(command_prefix=COMMAND_PREFIX, intents=intents)
+# Member cache policy (MEMBER_CACHE): only 'full' requests every member list at startup
+member_cache = {}
+if MEMBER_CACHE == 'stream' and PRESENCE_TRACKING:
+    # discord.py drops presence updates for uncached members, so the tracker would stay empty
+    raise ValueError("PRESENCE_TRACKING needs cached members; use MEMBER_CACHE=full or lazy instead of stream")
+if MEMBER_CACHE in ('lazy', 'stream'):
+    member_cache['chunk_guilds_at_startup'] = False
+if MEMBER_CACHE == 'stream':
+    member_cache['member_cache_flags'] = discord.MemberCacheFlags.none()
+    member_cache['member_cache_flags'].voice = True  # Members in voice stay cached for occupancy tracking
+
+# Create bot instance; SHARDED, SHARD_COUNT or SHARD_IDS split the gateway across several connections
+sharding = shard_options()
+if sharding is None:
+    bot = commands.Bot(command_prefix=COMMAND_PREFIX, intents=intents, **member_cache)
+else:
+    bot = commands.AutoShardedBot(command_prefix=COMMAND_PREFIX, intents=intents, **sharding, **member_cache)
+
+# Unix socket the bot serves its state on for separate web worker processes (None = in-process only)
+ipc_socket_path = BOT_IPC_SOCKET
+ipc_server = None
 
 @bot.event
 async def on_ready():
@@ -19,6 +42,8 @@ async def on_ready():
     print(f'{bot.user.name} has connected to Discord!')
     print(f'Bot ID: {bot.user.id}')
     print(f'Serving {len(bot.guilds)} guilds')
+    if sharding is not None:
+        print(f'Running shards {sorted(bot.shards)} of {bot.shard_count}')
     
     # Print guild information
     for guild in bot.guilds:
@@ -31,6 +56,28 @@ async def on_ready():
         print("Commands loaded successfully")
     except Exception as e:
         print(f"Error loading commands: {e}")
+    
+    # Load gateway event listeners (activity and presence tracking)
+    try:
+        from src.listeners import setup as setup_listeners
+        await setup_listeners(bot)
+        print("Listeners loaded successfully")
+    except Exception as e:
+        print(f"Error loading listeners: {e}")
+    
+    # Serve state to web workers running in other processes
+    global ipc_server
+    if ipc_socket_path and ipc_server is None:
+        try:
+            import src.realtime  # Registers the realtime and status IPC handlers
+            import src.activity  # Registers the activity IPC handlers
+            import src.presence  # Registers the presence IPC handlers
+            import src.voice  # Registers the voice history IPC handler
+            import src.shards  # Registers the shard statistics IPC handler
+            from src.bot_ipc import start_ipc_server
+            ipc_server = await start_ipc_server(bot, ipc_socket_path)
+        except Exception as e:
+            print(f"Error starting bot IPC server: {e}")
 
 @bot.event
 async def on_command_error(ctx, error):
@@ -64,6 +111,8 @@ def run_bot():
         print("2. Select your application")
         print("3. Go to the 'Bot' tab")
         print("4. Enable the 'SERVER MEMBERS INTENT' and 'MESSAGE CONTENT INTENT' under 'Privileged Gateway Intents'")
+        if PRESENCE_TRACKING:
+            print("5. PRESENCE_TRACKING=true also needs the 'PRESENCE INTENT'")
     except KeyboardInterrupt:
         print("Bot shutdown requested")
     except Exception as e:
@@ -73,12 +122,34 @@ def run_website(host='0.0.0.0', port=5000, debug=False):
     """Run the Flask website"""
     try:
         # Import here to avoid circular imports
-        from src.web_app import run_web_app
+        from src.web_app import run_web_app, attach_bot
+        # Hand over this module's bot; re-importing 'main' from the web app would create a second one
+        attach_bot(bot)
         run_web_app(host=host, port=port, debug=debug)
     except Exception as e:
         print(f"Error running website: {e}")
 
-if __name__ == "__main__":
+def run_web_workers(workers, port):
+    """Start gunicorn with several stateless web workers that reach the bot over IPC"""
+    env = dict(os.environ, BOT_IPC_SOCKET=ipc_socket_path)
+    command = ['gunicorn', '-w', str(workers), '-b', f'0.0.0.0:{port}', 'src.web_app:app']
+    print(f"Starting {workers} web workers on port {port}")
+    return subprocess.Popen(command, env=env)
+
+if __name__ == "__main__" and '--bot-only' in sys.argv:
+    # Gateway owner only; web workers are started separately with the same BOT_IPC_SOCKET
+    ipc_socket_path = ipc_socket_path or DEFAULT_BOT_IPC_SOCKET
+    run_bot()
+elif __name__ == "__main__" and '--workers' in sys.argv:
+    # One bot process owning the gateway plus N gunicorn workers reading from it
+    workers = int(sys.argv[sys.argv.index('--workers') + 1])
+    ipc_socket_path = ipc_socket_path or DEFAULT_BOT_IPC_SOCKET
+    web_process = run_web_workers(workers, int(os.getenv('PORT', 5000)))
+    try:
+        run_bot()
+    finally:
+        web_process.terminate()
+elif __name__ == "__main__":
     # Create a thread for the web server
     web_thread = threading.Thread(target=run_website, kwargs={'debug': False, 'port': 5000})
     web_thread.daemon = True  # This ensures the thread will exit when the main program exits
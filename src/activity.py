@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import heapq
+import struct
+from array import array
+from datetime import datetime, timezone
+from src.config import ACTIVITY_FILE
+from src.bot_ipc import ipc_handler
+
+# Ring buffer layouts: name -> (bucket width in seconds, number of buckets)
+RINGS = {
+    'minute': (60, 60),
+    'hour': (3600, 48),
+    'day': (86400, 30),
+}
+
+# Query windows: name -> (ring, number of most recent buckets summed)
+WINDOWS = {
+    'hour': ('minute', 60),
+    'day': ('hour', 24),
+    'week': ('day', 7),
+    'month': ('day', 30),
+}
+
+METRICS = ('messages', 'voice_seconds')
+HOURS_PER_WEEK = 168
+
+MAGIC = b'ACT1'
+
+class RingCounter:
+    """Counts per time bucket for the most recent `slots` buckets"""
+    
+    def __init__(self, width, slots):
+        self.width = width
+        self.slots = slots
+        self.counts = array('I', bytes(4 * slots))
+        self.head = -1  # Bucket number of the newest slot
+    
+    def _advance(self, bucket):
+        if bucket <= self.head:
+            return
+        # Clear the slots skipped over since the last write
+        for b in range(max(self.head + 1, bucket - self.slots + 1), bucket + 1):
+            self.counts[b % self.slots] = 0
+        self.head = bucket
+    
+    def add(self, t, amount=1):
+        bucket = int(t // self.width)
+        if bucket <= self.head - self.slots:
+            # Older than the ring covers
+            return
+        self._advance(bucket)
+        self.counts[bucket % self.slots] += int(amount)
+    
+    def total(self, now, buckets):
+        """Sum of the `buckets` most recent buckets as of `now`"""
+        current = int(now // self.width)
+        return sum(self.counts[b % self.slots] for b in range(current - buckets + 1, current + 1)
+                   if self.head - self.slots < b <= self.head)
+
+class ChannelActivity:
+    """Rolling message and voice counters plus hour-of-week totals for one channel"""
+    
+    def __init__(self):
+        self.rings = {metric: {name: RingCounter(*layout) for name, layout in RINGS.items()} for metric in METRICS}
+        self.heatmap = {metric: array('I', bytes(4 * HOURS_PER_WEEK)) for metric in METRICS}
+        self.last_message_at = 0.0
+    
+    def add(self, metric, t, amount=1):
+        for ring in self.rings[metric].values():
+            ring.add(t, amount)
+        self.heatmap[metric][hour_of_week(t)] += int(amount)
+
+def hour_of_week(t):
+    """Hour of the week (0 = Monday 00:00 UTC) for a Unix timestamp"""
+    moment = datetime.fromtimestamp(t, timezone.utc)
+    return moment.weekday() * 24 + moment.hour
+
+def _spread(width, start, end, add):
+    """Call add(t, seconds) for each bucket-aligned piece of [start, end)"""
+    t = start
+    while t < end:
+        step_end = min(end, (t // width + 1) * width)
+        add(t, step_end - t)
+        t = step_end
+
+class ActivityEngine:
+    """Incrementally maintained channel activity, fed by gateway events
+    
+    Every counter has a fixed size, so recording an event and answering a
+    query cost the same however much history has been seen.
+    """
+    
+    def __init__(self):
+        self.channels = {}
+        self.names = {}
+        self.guild_heatmap = {metric: array('I', bytes(4 * HOURS_PER_WEEK)) for metric in METRICS}
+    
+    def _channel(self, channel_id, name=None):
+        if name:
+            self.names[channel_id] = name
+        if channel_id not in self.channels:
+            self.channels[channel_id] = ChannelActivity()
+        return self.channels[channel_id]
+    
+    def record_message(self, channel_id, name=None, t=None):
+        t = time.time() if t is None else t
+        activity = self._channel(channel_id, name)
+        activity.add('messages', t)
+        activity.last_message_at = max(activity.last_message_at, t)
+        self.guild_heatmap['messages'][hour_of_week(t)] += 1
+    
+    def record_voice(self, channel_id, start, end, name=None):
+        """Credit a finished voice session's seconds to every bucket it overlapped"""
+        activity = self._channel(channel_id, name)
+        for ring in activity.rings['voice_seconds'].values():
+            # Only the part of the session the ring still covers is credited
+            _spread(ring.width, max(start, end - ring.width * ring.slots), end, ring.add)
+        
+        def add_to_heatmaps(t, seconds):
+            activity.heatmap['voice_seconds'][hour_of_week(t)] += int(seconds)
+            self.guild_heatmap['voice_seconds'][hour_of_week(t)] += int(seconds)
+        _spread(3600, start, end, add_to_heatmaps)
+    
+    def note_last_message(self, channel_id, t, name=None):
+        """Remember a channel's latest message time learned some other way, without counting it"""
+        activity = self._channel(channel_id, name)
+        activity.last_message_at = max(activity.last_message_at, t)
+    
+    def last_message_at(self, channel_id):
+        activity = self.channels.get(channel_id)
+        return activity.last_message_at if activity and activity.last_message_at else None
+    
+    def top_channels(self, metric='messages', window='day', limit=10, now=None):
+        """Return the most active channels over a window, most active first"""
+        if metric not in METRICS or window not in WINDOWS:
+            raise ValueError(f"metric must be one of {METRICS} and window one of {tuple(WINDOWS)}")
+        
+        now = time.time() if now is None else now
+        ring_name, buckets = WINDOWS[window]
+        totals = ((activity.rings[metric][ring_name].total(now, buckets), channel_id)
+                  for channel_id, activity in self.channels.items())
+        return [
+            {'id': str(channel_id), 'name': self.names.get(channel_id), metric: total}
+            for total, channel_id in heapq.nlargest(limit, totals) if total
+        ]
+    
+    def heatmap(self, metric='messages', channel_id=None):
+        """Return 7 rows (Monday first) of 24 hourly totals, in UTC"""
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {METRICS}")
+        
+        if channel_id is None:
+            cells = self.guild_heatmap[metric]
+        elif channel_id in self.channels:
+            cells = self.channels[channel_id].heatmap[metric]
+        else:
+            cells = array('I', bytes(4 * HOURS_PER_WEEK))
+        return [list(cells[day * 24:(day + 1) * 24]) for day in range(7)]
+    
+    def save(self, path=ACTIVITY_FILE):
+        """Write all counters as packed uint32 arrays behind a small JSON header"""
+        channel_ids = sorted(self.channels)
+        header = json.dumps({
+            'saved_at': time.time(),
+            'rings': RINGS,
+            'channels': [[str(c), self.names.get(c), self.channels[c].last_message_at] for c in channel_ids],
+        }).encode('utf-8')
+        
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC + struct.pack('<I', len(header)) + header)
+            for metric in METRICS:
+                f.write(self.guild_heatmap[metric].tobytes())
+            for channel_id in channel_ids:
+                activity = self.channels[channel_id]
+                for metric in METRICS:
+                    for name in RINGS:
+                        ring = activity.rings[metric][name]
+                        f.write(struct.pack('<q', ring.head) + ring.counts.tobytes())
+                    f.write(activity.heatmap[metric].tobytes())
+        os.replace(tmp_path, path)
+    
+    def restore(self, path=ACTIVITY_FILE):
+        """Replace the counters with those written by save(); a file with a different ring layout is ignored"""
+        with open(path, 'rb') as f:
+            if f.read(4) != MAGIC:
+                raise ValueError(f"Not an activity file: {path}")
+            header = json.loads(f.read(struct.unpack('<I', f.read(4))[0]))
+            if {k: tuple(v) for k, v in header['rings'].items()} != RINGS:
+                print(f"Ignoring activity file with a different ring layout: {path}")
+                return
+            
+            def read_array(length):
+                values = array('I')
+                values.frombytes(f.read(4 * length))
+                return values
+            
+            self.channels = {}
+            for metric in METRICS:
+                self.guild_heatmap[metric] = read_array(HOURS_PER_WEEK)
+            for channel_id, name, last_message_at in header['channels']:
+                activity = self._channel(int(channel_id), name)
+                activity.last_message_at = last_message_at
+                for metric in METRICS:
+                    for ring_name, (_, slots) in RINGS.items():
+                        ring = activity.rings[metric][ring_name]
+                        ring.head = struct.unpack('<q', f.read(8))[0]
+                        ring.counts = read_array(slots)
+                    activity.heatmap[metric] = read_array(HOURS_PER_WEEK)
+
+def load_engine(path=ACTIVITY_FILE):
+    """Return an engine holding the persisted counters, or an empty one if there are none"""
+    loaded = ActivityEngine()
+    if os.path.exists(path):
+        try:
+            loaded.restore(path)
+        except Exception as e:
+            print(f"Error loading activity data: {e}")
+    return loaded
+
+# Live engine owned by the bot process; restored from disk when the listeners start
+engine = ActivityEngine()
+
+@ipc_handler('activity_top')
+async def ipc_activity_top(bot, metric='messages', window='day', limit=10):
+    return {'metric': metric, 'window': window, 'channels': engine.top_channels(metric, window, int(limit))}
+
+@ipc_handler('activity_heatmap')
+async def ipc_activity_heatmap(bot, metric='messages', channel_id=None):
+    return {'metric': metric, 'channel_id': channel_id, 'heatmap': engine.heatmap(metric, int(channel_id) if channel_id else None)}
@@ -0,0 +1,22 @@
+import hmac
+import functools
+from flask import request, jsonify
+from src.config import ADMIN_TOKEN
+
+def is_admin_request(request):
+    """Check whether a Flask request carries the configured admin token"""
+    if not ADMIN_TOKEN:
+        # Admin features are disabled when no token is configured
+        return False
+    
+    token = request.headers.get('X-Admin-Token', '')
+    return hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8'))
+
+def admin_required(view):
+    """Reject requests to a Flask view that do not carry the admin token"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not is_admin_request(request):
+            return jsonify({"status": "error", "message": "Admin token required"}), 403
+        return view(*args, **kwargs)
+    return wrapper
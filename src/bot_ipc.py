@@ -0,0 +1,74 @@
+import os
+import json
+import socket
+import asyncio
+from src.config import BOT_IPC_SOCKET, BOT_IPC_TIMEOUT
+
+# One bot process owns the Discord gateway and answers requests from any number
+# of web workers over a Unix socket. Each request is one line of JSON
+# ({"method": ..., "params": {...}}) and gets one line of JSON back.
+
+_handlers = {}
+
+class IPCUnavailable(Exception):
+    """Raised when the bot process cannot be reached"""
+
+def ipc_handler(name):
+    """Register a coroutine handler(bot, **params) for an IPC method"""
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+async def _handle_connection(bot, reader, writer):
+    """Answer a single request from a web worker"""
+    try:
+        request = json.loads(await reader.readline())
+        handler = _handlers.get(request.get('method'))
+        if handler is None:
+            result = {"error": f"Unknown IPC method: {request.get('method')}", "status": "error"}
+        else:
+            result = await handler(bot, **request.get('params', {}))
+    except Exception as e:
+        print(f"Error handling IPC request: {e}")
+        result = {"error": str(e), "status": "error"}
+    
+    try:
+        writer.write(json.dumps(result, default=str).encode('utf-8') + b'\n')
+        await writer.drain()
+    finally:
+        writer.close()
+
+async def start_ipc_server(bot, path=None):
+    """Start serving IPC requests on the bot's event loop"""
+    path = path or BOT_IPC_SOCKET
+    if os.path.exists(path):
+        # Stale socket from a previous run
+        os.remove(path)
+    
+    server = await asyncio.start_unix_server(lambda r, w: _handle_connection(bot, r, w), path=path)
+    print(f"Bot IPC server listening on {path}")
+    return server
+
+def query(method, params=None, path=None, timeout=BOT_IPC_TIMEOUT):
+    """Send a request to the bot process and return its JSON reply (blocking)"""
+    path = path or BOT_IPC_SOCKET
+    if not path:
+        raise IPCUnavailable("BOT_IPC_SOCKET is not configured")
+    
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(json.dumps({'method': method, 'params': params or {}}).encode('utf-8') + b'\n')
+            
+            chunks = []
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                chunks.append(data)
+    except OSError as e:
+        raise IPCUnavailable(f"Bot process unreachable at {path}: {e}")
+    
+    return json.loads(b''.join(chunks))
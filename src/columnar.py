@@ -0,0 +1,173 @@
+import os
+import json
+from datetime import datetime, timezone
+from src.config import EXPORT_DIR
+from src.member_format import compact_members
+from src.indexed_members import IndexedMembers
+
+# numpy is optional; the columnar export is skipped without it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+STATUS_CODES = ['unknown', 'online', 'idle', 'dnd', 'offline', 'invisible']
+SECONDS_PER_WEEK = 7 * 24 * 3600
+
+# Members unpacked at once by the role aggregates, bounding their memory to
+# OVERLAP_CHUNK x roles x 4 bytes instead of growing with the guild
+OVERLAP_CHUNK = 8192
+
+def columnar_path(timestamp):
+    """Return the directory holding the columnar member snapshot for an export"""
+    return os.path.join(EXPORT_DIR, f'columnar_{timestamp}')
+
+def _epoch(iso_time):
+    """Convert an ISO timestamp to epoch seconds, or -1 if missing"""
+    if not iso_time:
+        return -1
+    try:
+        return int(datetime.fromisoformat(iso_time).timestamp())
+    except ValueError:
+        return -1
+
+def write_columnar_members(members, timestamp):
+    """Write members as one .npy array per column
+    
+    Columns: id (uint64), joined_at (int64 epoch seconds, -1 if unknown),
+    bot (bool), status (uint8 index into STATUS_CODES) and roles (a uint64
+    bitmask matrix of shape (members, ceil(roles / 64)) over the role table
+    stored in meta.json). members is members data or an IndexedMembers
+    reader; a reader is converted a page at a time into memory-mapped
+    arrays, so the whole list is never held in memory. Returns the directory
+    path, or None if numpy is missing.
+    """
+    if np is None:
+        print("Columnar export skipped: numpy is not installed")
+        return None
+    
+    if isinstance(members, IndexedMembers):
+        roles, count = members.roles, len(members)
+        pages = (page['members'] for page in members.pages())
+    else:
+        data = compact_members(members)
+        rows = [m for m in data['members'] if 'error' not in m]
+        roles, count, pages = data['roles'], len(rows), [rows]
+    
+    role_words = max(1, (len(roles) + 63) // 64)
+    status_index = {status: i for i, status in enumerate(STATUS_CODES)}
+    
+    path = columnar_path(timestamp)
+    os.makedirs(path, exist_ok=True)
+    
+    def create(name, dtype, shape):
+        return np.lib.format.open_memmap(os.path.join(path, f'{name}.npy'), mode='w+', dtype=dtype, shape=shape)
+    
+    ids = create('id', np.uint64, (count,))
+    joined = create('joined_at', np.int64, (count,))
+    bots = create('bot', np.bool_, (count,))
+    statuses = create('status', np.uint8, (count,))
+    role_bits = create('roles', np.uint64, (count, role_words))
+    
+    start = 0
+    for rows in pages:
+        end = start + len(rows)
+        ids[start:end] = np.fromiter((m['id'] for m in rows), dtype=np.uint64, count=len(rows))
+        joined[start:end] = np.fromiter((_epoch(m.get('joined_at')) for m in rows), dtype=np.int64, count=len(rows))
+        bots[start:end] = np.fromiter((bool(m.get('bot')) for m in rows), dtype=np.bool_, count=len(rows))
+        statuses[start:end] = np.fromiter((status_index.get(m.get('status'), 0) for m in rows), dtype=np.uint8, count=len(rows))
+        
+        page_bits = np.zeros((len(rows), role_words), dtype=np.uint64)
+        for row, member in enumerate(rows):
+            for index in member.get('roles', []):
+                page_bits[row, index // 64] |= np.uint64(1) << np.uint64(index % 64)
+        role_bits[start:end] = page_bits
+        start = end
+    
+    for column in (ids, joined, bots, statuses, role_bits):
+        column.flush()
+    
+    with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({'count': count, 'roles': roles, 'status_codes': STATUS_CODES}, f, indent=4)
+    
+    return path
+
+def latest_columnar_path():
+    """Return the newest columnar snapshot directory, or None"""
+    if not os.path.exists(EXPORT_DIR):
+        return None
+    snapshots = sorted(f for f in os.listdir(EXPORT_DIR) if f.startswith('columnar_'))
+    return os.path.join(EXPORT_DIR, snapshots[-1]) if snapshots else None
+
+class MemberColumns:
+    """Read-only, memory-mapped view of a columnar member snapshot"""
+    
+    def __init__(self, path):
+        if np is None:
+            raise RuntimeError("numpy is required to read columnar snapshots")
+        
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        
+        def load(name):
+            return np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+        
+        self.ids = load('id')
+        self.joined_at = load('joined_at')
+        self.bot = load('bot')
+        self.status = load('status')
+        self.roles = load('roles')
+    
+    def __len__(self):
+        return self.meta['count']
+    
+    def role_matrix(self, start=0, stop=None):
+        """Return a (members, roles) boolean matrix unpacked from the bitmasks of rows [start, stop)"""
+        role_count = len(self.meta['roles'])
+        words = np.ascontiguousarray(self.roles[start:stop]).astype('<u8')
+        # Little-endian bytes + bitorder='little' puts role i at bit position i
+        bits = np.unpackbits(words.view(np.uint8), axis=1, bitorder='little')
+        return bits[:, :role_count].astype(bool)
+    
+    def _role_chunks(self):
+        """Yield the role matrix OVERLAP_CHUNK members at a time"""
+        for start in range(0, len(self), OVERLAP_CHUNK):
+            yield self.role_matrix(start, start + OVERLAP_CHUNK)
+    
+    def bot_ratio(self):
+        return float(self.bot.mean()) if len(self) else 0.0
+    
+    def status_breakdown(self):
+        counts = np.bincount(self.status, minlength=len(STATUS_CODES))
+        return {status: int(counts[i]) for i, status in enumerate(STATUS_CODES) if counts[i]}
+    
+    def joins_per_week(self):
+        """Return {week_start_iso_date: join_count}, weeks starting on Monday"""
+        joined = self.joined_at[self.joined_at >= 0]
+        if not len(joined):
+            return {}
+        
+        # The Unix epoch fell on a Thursday; shift so weeks start on Monday
+        monday_offset = 3 * 24 * 3600
+        weeks, counts = np.unique((joined + monday_offset) // SECONDS_PER_WEEK, return_counts=True)
+        return {
+            datetime.fromtimestamp(int(week) * SECONDS_PER_WEEK - monday_offset, timezone.utc).date().isoformat(): int(count)
+            for week, count in zip(weeks, counts)
+        }
+    
+    def role_member_counts(self):
+        """Return [{id, name, count}] in role table order; role names need not be unique"""
+        counts = np.zeros(len(self.meta['roles']), dtype=np.int64)
+        for chunk in self._role_chunks():
+            counts += chunk.sum(axis=0)
+        return [dict(id=role['id'], name=role['name'], count=int(counts[i])) for i, role in enumerate(self.meta['roles'])]
+    
+    def role_overlap(self):
+        """Return (roles, matrix) where matrix[i][j] counts members holding both roles"""
+        role_count = len(self.meta['roles'])
+        overlap = np.zeros((role_count, role_count), dtype=np.int64)
+        for chunk in self._role_chunks():
+            # A float32 matmul runs through BLAS and is exact for a chunk's counts (below 2**24)
+            matrix = chunk.astype(np.float32)
+            overlap += (matrix.T @ matrix).astype(np.int64)
+        return [{'id': role['id'], 'name': role['name']} for role in self.meta['roles']], overlap.tolist()
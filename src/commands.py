@@ -1,8 +1,13 @@
+import asyncio
 import discord
 from discord.ext import commands, tasks
 from src.exporters import export_all
+from src.bot_ipc import ipc_handler
 import datetime
 
+# Exports started over IPC; kept referenced until they finish
+_background_exports = set()
+
 class ServerInfoCommands(commands.Cog):
     """Commands for fetching and exporting server information"""
     
@@ -215,6 +220,18 @@ async def export_server_data(ctx):
             await ctx.send(f"Error during export: {str(e)}")
         return None
 
+@ipc_handler('export')
+async def ipc_export(bot):
+    """Start an export on behalf of a web worker"""
+    if not bot.guilds:
+        return {"status": "error", "message": "No guilds available for export"}
+    
+    guild = bot.guilds[0]
+    task = asyncio.create_task(export_all(guild))
+    _background_exports.add(task)
+    task.add_done_callback(_background_exports.discard)
+    return {"status": "success", "message": f"Export started for {guild.name}"}
+
 async def setup(bot):
     """Add the ServerInfoCommands cog to the bot"""
     await bot.add_cog(ServerInfoCommands(bot))
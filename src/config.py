@@ -10,3 +10,101 @@ COMMAND_PREFIX = '!'
 
 # Export configuration
 EXPORT_DIR = 'server_data'
+
+# Admin configuration (token expected in the X-Admin-Token header)
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+# Profiling configuration
+PROFILE_ENABLED = os.getenv('PROFILE_ENABLED', 'false').lower() == 'true'
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', '40'))  # Oldest profiles are deleted past this
+PROFILE_TOP_N = int(os.getenv('PROFILE_TOP_N', '30'))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv('PROFILE_SAMPLE_INTERVAL', '0.005'))  # Seconds between stack samples
+
+# Bulk upload configuration (must be on the same filesystem as EXPORT_DIR)
+UPLOAD_DIR = os.getenv('UPLOAD_DIR', '.uploads')
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(1024 * 1024)))  # Bytes per chunk
+UPLOAD_MAX_ENTRY_BYTES = int(os.getenv('UPLOAD_MAX_ENTRY_BYTES', str(100 * 1024 * 1024)))  # Per extracted file
+UPLOAD_MAX_TOTAL_BYTES = int(os.getenv('UPLOAD_MAX_TOTAL_BYTES', str(500 * 1024 * 1024)))  # Per archive, extracted
+UPLOAD_MAX_ENTRIES = int(os.getenv('UPLOAD_MAX_ENTRIES', '10000'))
+UPLOAD_MAX_ARCHIVE_BYTES = int(os.getenv('UPLOAD_MAX_ARCHIVE_BYTES', str(500 * 1024 * 1024)))  # Per chunked archive, compressed
+UPLOAD_EXPIRY_SECONDS = int(os.getenv('UPLOAD_EXPIRY_SECONDS', str(24 * 3600)))  # Unfinished uploads idle this long are deleted
+
+# Columnar member export for analytics (requires numpy)
+COLUMNAR_EXPORT = os.getenv('COLUMNAR_EXPORT', 'false').lower() == 'true'
+
+# Bot IPC configuration: when set, web workers read live bot state from this Unix socket
+BOT_IPC_SOCKET = os.getenv('BOT_IPC_SOCKET')
+DEFAULT_BOT_IPC_SOCKET = '/tmp/discord-to-site-bot.sock'
+BOT_IPC_TIMEOUT = float(os.getenv('BOT_IPC_TIMEOUT', '10'))  # Seconds
+
+# Web serving mode: 'combined' links the bot running in this process (lazily, on first use);
+# 'snapshot' only serves exported files and never imports discord.py
+SERVE_MODE = os.getenv('SERVE_MODE', 'combined').lower()
+
+# Warm the latest snapshot into each worker's caches at startup; /api/ready reports 503 until done
+WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'true').lower() == 'true'
+
+# Seconds /api/health reuses its computed status (Render polls it continuously)
+HEALTH_CACHE_TTL = float(os.getenv('HEALTH_CACHE_TTL', '5'))
+
+# Discord REST scheduler: client-side limits per route, as (requests, per seconds);
+# buckets are per route and major ID (channel or guild)
+REST_GLOBAL_RATE = int(os.getenv('REST_GLOBAL_RATE', '45'))  # Requests per second, below Discord's 50
+REST_BUCKET_LIMITS = {
+    'messages': (5, 5.0),
+    'members': (5, 5.0),
+    'scheduled_events': (5, 5.0),
+    'default': (5, 5.0),
+}
+REST_MAX_RETRIES = int(os.getenv('REST_MAX_RETRIES', '3'))  # Retries after a 429
+
+# Message history archive: per-channel gzip segments plus persisted `after` cursors
+# Off by default: the first run crawls every channel's full history before the snapshot is published
+MESSAGE_ARCHIVE_ENABLED = os.getenv('MESSAGE_ARCHIVE_ENABLED', 'false').lower() == 'true'
+MESSAGE_ARCHIVE_DIR = os.path.join(EXPORT_DIR, 'messages')
+MESSAGE_SEGMENT_BYTES = int(os.getenv('MESSAGE_SEGMENT_BYTES', str(8 * 1024 * 1024)))  # Roll to a new segment past this
+MESSAGE_ARCHIVE_CONCURRENCY = int(os.getenv('MESSAGE_ARCHIVE_CONCURRENCY', '4'))  # Channels crawled at once
+
+# Full-text search index (SQLite FTS5) over members, channels, events and archived messages
+SEARCH_DB = os.path.join(EXPORT_DIR, 'search.db')
+
+# Activity analytics (message and voice ring buffers), persisted by the bot
+ACTIVITY_FILE = os.path.join(EXPORT_DIR, 'activity.bin')
+ACTIVITY_SAVE_INTERVAL = int(os.getenv('ACTIVITY_SAVE_INTERVAL', '300'))  # Seconds
+
+# Presence tracking (needs the privileged PRESENCE INTENT enabled in the Developer Portal)
+PRESENCE_TRACKING = os.getenv('PRESENCE_TRACKING', 'false').lower() == 'true'
+PRESENCE_DIR = os.path.join(EXPORT_DIR, 'presence')
+PRESENCE_LOG = os.path.join(PRESENCE_DIR, 'transitions.log')  # Append-only status transitions
+PRESENCE_PEAKS_FILE = os.path.join(PRESENCE_DIR, 'peaks.json')
+
+# Voice occupancy tracking: finished sessions are logged; recent ones feed the occupancy history
+VOICE_SESSION_LOG = os.path.join(EXPORT_DIR, 'voice', 'sessions.log')
+VOICE_HISTORY_HOURS = int(os.getenv('VOICE_HISTORY_HOURS', '168'))
+
+# /api/realtime micro-cache: served fresh for the TTL, then stale for up to REALTIME_STALE_TTL more
+# seconds while a single background refresh runs
+REALTIME_CACHE_TTL = float(os.getenv('REALTIME_CACHE_TTL', '10'))
+REALTIME_STALE_TTL = float(os.getenv('REALTIME_STALE_TTL', '30'))
+
+# Static site build: dashboard plus pre-rendered JSON for a static host or CDN, written after each export
+STATIC_SITE_ENABLED = os.getenv('STATIC_SITE_ENABLED', 'false').lower() == 'true'
+STATIC_SITE_DIR = os.getenv('STATIC_SITE_DIR', 'static_site')
+STATIC_MEMBERS_PAGE_SIZE = int(os.getenv('STATIC_MEMBERS_PAGE_SIZE', '500'))
+
+# HTTP caching: snapshot-addressed URLs never change; /api/latest points at the newest snapshot
+SNAPSHOT_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+LATEST_MAX_AGE = int(os.getenv('LATEST_MAX_AGE', '30'))  # Seconds
+
+# Gateway sharding: SHARDED=true runs an AutoShardedBot with Discord's recommended shard count
+# (or SHARD_COUNT); SHARD_IDS (e.g. "0-3" or "0,2") runs only those shards. Split processes are not supported:
+# they would share the state files under EXPORT_DIR and the IPC socket
+SHARDED = os.getenv('SHARDED', 'false').lower() == 'true'
+SHARD_COUNT = int(os.getenv('SHARD_COUNT')) if os.getenv('SHARD_COUNT') else None
+SHARD_IDS = os.getenv('SHARD_IDS')
+
+# Member cache policy: 'full' requests every guild's member list at startup; 'lazy' requests a guild's
+# list the first time an export or /api/realtime needs it; 'stream' keeps members out of the cache and
+# exports them from paged REST requests at constant memory
+MEMBER_CACHE = os.getenv('MEMBER_CACHE', 'full').lower()
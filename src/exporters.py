@@ -1,7 +1,16 @@
 import os
 import json
+import time
+import asyncio
+import discord
 from datetime import datetime
-from src.config import EXPORT_DIR
+from src.config import EXPORT_DIR, COLUMNAR_EXPORT, MESSAGE_ARCHIVE_ENABLED, MESSAGE_ARCHIVE_CONCURRENCY, STATIC_SITE_ENABLED, MEMBER_CACHE
+from src.profiling import profile_coroutine
+from src.columnar import write_columnar_members
+from src.indexed_members import IndexedMembers, IndexedMembersWriter
+from src.rest_scheduler import scheduler, BACKGROUND
+from src.projections import write_projections
+from src import message_archive, search_index, static_site
 
 # Ensure export directory exists
 os.makedirs(EXPORT_DIR, exist_ok=True)
@@ -10,6 +19,7 @@ def get_timestamp():
     """Generate a timestamp string for file naming"""
     return datetime.now().strftime("%Y%m%d_%H%M%S")
 
+@profile_coroutine('export_channels')
 async def export_channels(guild, timestamp=None):
     """Export all channels to JSON"""
     if timestamp is None:
@@ -44,6 +54,7 @@ async def export_channels(guild, timestamp=None):
     
     return filepath
 
+@profile_coroutine('export_roles')
 async def export_roles(guild, timestamp=None):
     """Export all roles to JSON"""
     if timestamp is None:
@@ -78,52 +89,117 @@ async def export_roles(guild, timestamp=None):
     
     return filepath
 
+def member_record(member, role_index, with_status=True):
+    """Convert a member to its export record, with roles as indexes into the role table
+    
+    Members fetched over REST report every status as offline, so theirs is left out.
+    """
+    member_info = {
+        'id': member.id,
+        'name': member.name,
+        'display_name': member.display_name,
+        'joined_at': member.joined_at.isoformat() if member.joined_at else None,
+        'bot': member.bot,
+        'roles': [role_index[role.id] for role in member.roles if role.id in role_index],
+    }
+    
+    # Status is not always available due to intents restrictions
+    if with_status and hasattr(member, 'status'):
+        member_info['status'] = str(member.status)
+    
+    return member_info
+
+async def guild_members(guild):
+    """Yield the guild's members according to the MEMBER_CACHE policy"""
+    if MEMBER_CACHE == 'stream':
+        # Pages of 1000 from the REST API, never stored in the member cache; statuses are unknown
+        after = None
+        while True:
+            async def fetch_page():
+                return [m async for m in guild.fetch_members(
+                    limit=1000, after=discord.Object(id=after) if after else None
+                )]
+            
+            # One page is one REST call, so every page goes through the guild's bucket
+            page = await scheduler.submit(f'members:{guild.id}', fetch_page, priority=BACKGROUND)
+            for member in page:
+                yield member
+            
+            if len(page) < 1000:
+                break
+            after = page[-1].id
+        return
+    
+    if MEMBER_CACHE == 'lazy' and not guild.chunked:
+        print(f"Requesting the member list of {guild.name}")
+        await guild.chunk()
+    
+    for member in guild.members:
+        yield member
+
+@profile_coroutine('export_members')
 async def export_members(guild, timestamp=None):
-    """Export all members to JSON"""
+    """Export all members to JSON
+    
+    Members are written to the file as they are read, so only one member
+    record is held at a time.
+    """
     if timestamp is None:
         timestamp = get_timestamp()
     
-    members_data = []
+    # Role dictionary shared by all members; each member stores indexes into it
+    role_table = []
+    role_index = {}
+    for role in guild.roles:
+        if role.name != '@everyone':
+            role_index[role.id] = len(role_table)
+            role_table.append({'id': role.id, 'name': role.name})
+    
+    # Save to file; compact exports get an offset index for paged, memory-mapped reads
+    filepath = os.path.join(EXPORT_DIR, f'members_{timestamp}.json')
+    writer = IndexedMembersWriter(filepath, role_table)
     
     try:
         # Try to get member count first
         print(f"Attempting to export {guild.member_count} members from {guild.name}")
         
-        for member in guild.members:
+        with_status = MEMBER_CACHE != 'stream'
+        async for member in guild_members(guild):
             try:
-                member_info = {
-                    'id': member.id,
-                    'name': member.name,
-                    'display_name': member.display_name,
-                    'joined_at': member.joined_at.isoformat() if member.joined_at else None,
-                    'bot': member.bot,
-                    'roles': [{'id': role.id, 'name': role.name} for role in member.roles if role.name != '@everyone'],
-                }
-                
-                # Status is not always available due to intents restrictions
-                if hasattr(member, 'status'):
-                    member_info['status'] = str(member.status)
-                
-                members_data.append(member_info)
+                writer.add(member_record(member, role_index, with_status))
             except Exception as e:
                 print(f"Error processing member {getattr(member, 'name', 'unknown')}: {e}")
+        
+        writer.close()
     except Exception as e:
         print(f"Error accessing members list: {e}")
         print("This is likely due to missing privileged intents. Please enable SERVER MEMBERS INTENT in the Discord Developer Portal.")
+        writer.abort()
         
         # Add a placeholder entry to indicate the issue
         members_data = [{
             'error': 'Could not access member data. Please enable SERVER MEMBERS INTENT in the Discord Developer Portal.',
             'member_count': getattr(guild, 'member_count', 'unknown')
         }]
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(members_data, f, indent=4)
+        return filepath
     
-    # Save to file
-    filepath = os.path.join(EXPORT_DIR, f'members_{timestamp}.json')
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(members_data, f, indent=4)
+    # Optional columnar copy for analytics queries, filled from the members file a page at a time
+    if COLUMNAR_EXPORT:
+        members = IndexedMembers(filepath)
+        try:
+            columnar_dir = write_columnar_members(members, timestamp)
+            if columnar_dir:
+                print(f"Columnar members exported to {columnar_dir}")
+        except Exception as e:
+            print(f"Error writing columnar members: {e}")
+        finally:
+            members.close()
     
     return filepath
 
+@profile_coroutine('export_events')
 async def export_events(guild, timestamp=None):
     """Export all scheduled events to JSON"""
     if timestamp is None:
@@ -133,7 +209,10 @@ async def export_events(guild, timestamp=None):
     
     try:
         # Fetch all scheduled events
-        scheduled_events = await guild.fetch_scheduled_events()
+        scheduled_events = await scheduler.submit(
+            f'scheduled_events:{guild.id}', guild.fetch_scheduled_events,
+            priority=BACKGROUND, key=f'scheduled_events:{guild.id}'
+        )
         
         for event in scheduled_events:
             try:
@@ -162,9 +241,87 @@ async def export_events(guild, timestamp=None):
     
     return filepath
 
+def message_record(message):
+    """Convert a Discord message to the dict stored in the archive"""
+    return {
+        'id': message.id,
+        'channel_id': message.channel.id,
+        'author_id': message.author.id,
+        'author': message.author.display_name,
+        'created_at': message.created_at.isoformat(),
+        'edited_at': message.edited_at.isoformat() if message.edited_at else None,
+        'content': message.content,
+        'attachments': [a.url for a in message.attachments],
+        'reply_to': message.reference.message_id if message.reference else None,
+    }
+
+async def archive_channel(channel, cursors):
+    """Fetch the messages posted after the channel's cursor and append them to its archive"""
+    archived = 0
+    after = cursors.get(channel.id)
+    
+    while True:
+        async def fetch_page():
+            return [m async for m in channel.history(
+                limit=100, after=discord.Object(id=after) if after else None, oldest_first=True
+            )]
+        
+        # One page is one REST call, so every page goes through the channel's bucket
+        page = await scheduler.submit(f'messages:{channel.id}', fetch_page, priority=BACKGROUND)
+        if not page:
+            break
+        
+        message_archive.append_messages(channel.id, [message_record(m) for m in page])
+        archived += len(page)
+        after = page[-1].id
+        
+        # Advance the cursor only after the page is on disk
+        cursors[channel.id] = after
+        message_archive.save_cursors(cursors)
+        
+        if len(page) < 100:
+            break
+    
+    return archived
+
+@profile_coroutine('export_messages')
+async def export_messages(guild, timestamp=None):
+    """Archive new text channel messages and write a per-run manifest
+    
+    Channels are crawled concurrently; the REST scheduler keeps each one
+    within its rate limit bucket.
+    """
+    if timestamp is None:
+        timestamp = get_timestamp()
+    
+    cursors = message_archive.load_cursors()
+    semaphore = asyncio.Semaphore(MESSAGE_ARCHIVE_CONCURRENCY)
+    
+    async def crawl(channel):
+        async with semaphore:
+            try:
+                archived = await archive_channel(channel, cursors)
+                return {'channel_id': channel.id, 'name': channel.name, 'new_messages': archived, 'cursor': cursors.get(channel.id)}
+            except Exception as e:
+                print(f"Error archiving messages for channel {channel.name}: {e}")
+                return {'channel_id': channel.id, 'name': channel.name, 'error': str(e), 'cursor': cursors.get(channel.id)}
+    
+    channels = [c for c in guild.text_channels if c.permissions_for(guild.me).read_message_history]
+    messages_data = await asyncio.gather(*(crawl(channel) for channel in channels))
+    print(f"Archived {sum(c.get('new_messages', 0) for c in messages_data)} new messages from {len(channels)} channels")
+    
+    # Save to file
+    filepath = os.path.join(EXPORT_DIR, f'messages_{timestamp}.json')
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(messages_data, f, indent=4)
+    
+    return filepath
+
+@profile_coroutine('export_all')
 async def export_all(guild):
     """Export all server data to JSON files"""
     timestamp = get_timestamp()
+    start = time.perf_counter()
     
     # Create a dictionary to store all file paths
     export_files = {}
@@ -185,17 +342,44 @@ async def export_all(guild):
     export_files['events'] = await export_events(guild, timestamp)
     print(f"Events exported to {export_files['events']}")
     
+    # Archive new messages since the last run
+    if MESSAGE_ARCHIVE_ENABLED:
+        export_files['messages'] = await export_messages(guild, timestamp)
+        print(f"Messages archived, manifest at {export_files['messages']}")
+    
     # Create a summary file
     summary = {
         'server_name': guild.name,
         'server_id': guild.id,
         'export_time': datetime.now().isoformat(),
+        'export_duration_seconds': round(time.perf_counter() - start, 2),
         'files': export_files
     }
     
+    # Pre-serialized widget and table views, served as is for ?fields=widget|table
+    try:
+        summary['projections'] = await asyncio.to_thread(write_projections, export_files, timestamp)
+    except Exception as e:
+        print(f"Error writing projections: {e}")
+    
     summary_path = os.path.join(EXPORT_DIR, f'summary_{timestamp}.json')
     with open(summary_path, 'w', encoding='utf-8') as f:
         json.dump(summary, f, indent=4)
     
     print(f"Summary exported to {summary_path}")
+    
+    # Add the new export and newly archived messages to the search index
+    try:
+        indexed = await asyncio.to_thread(search_index.update_index, summary)
+        print(f"Search index updated with {indexed} documents")
+    except Exception as e:
+        print(f"Error updating search index: {e}")
+    
+    # Render the dashboard and its data to flat files for a static host
+    if STATIC_SITE_ENABLED:
+        try:
+            await asyncio.to_thread(static_site.build_static_site, summary)
+        except Exception as e:
+            print(f"Error building static site: {e}")
+    
     return summary_path
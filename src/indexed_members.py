@@ -0,0 +1,129 @@
+import os
+import sys
+import json
+import mmap
+import struct
+from src.member_format import COMPACT_FORMAT
+
+# Members files are written one member per line inside an ordinary JSON
+# document, so they stay readable by json.load:
+#
+#     {"format": "members-v2", "roles": [...], "members": [
+#     {...member 0...},
+#     {...member 1...}
+#     ]}
+#
+# A sidecar "<file>.idx" holds the byte range of every member line:
+#     magic (8 bytes) | count (uint64) | count x (start, end) uint64 pairs
+# Readers mmap both files, so gunicorn workers share the OS page cache and a
+# page of members is served without parsing the rest of the file.
+
+INDEX_MAGIC = b'MIDX1\x00\x00\x00'
+INDEX_HEADER = struct.Struct('<8sQ')
+
+def index_path(filepath):
+    return filepath + '.idx'
+
+class IndexedMembersWriter:
+    """Stream member records into an indexed members file
+    
+    Offsets go straight to the index file, so memory use does not grow
+    with the number of members.
+    """
+    
+    def __init__(self, filepath, roles):
+        self.filepath = filepath
+        self.count = 0
+        self._file = open(filepath, 'wb')
+        self._index = open(index_path(filepath), 'wb')
+        # The count is filled in on close
+        self._index.write(INDEX_HEADER.pack(INDEX_MAGIC, 0))
+        header = json.dumps({'format': COMPACT_FORMAT, 'roles': roles})
+        # Re-open the object to append the members array as the last key
+        self._file.write(header[:-1].encode('utf-8') + b', "members": [\n')
+    
+    def add(self, member):
+        if self.count:
+            self._file.write(b',\n')
+        start = self._file.tell()
+        self._file.write(json.dumps(member, separators=(',', ':')).encode('utf-8'))
+        self._index.write(struct.pack('<QQ', start, self._file.tell()))
+        self.count += 1
+    
+    def close(self):
+        self._file.write(b'\n]}\n')
+        self._file.close()
+        
+        # Finished after the data file, so has_index() sees an index at least as new
+        self._index.seek(0)
+        self._index.write(INDEX_HEADER.pack(INDEX_MAGIC, self.count))
+        self._index.close()
+        return self.filepath
+    
+    def abort(self):
+        """Close and delete the partly written file and its index"""
+        self._file.close()
+        self._index.close()
+        os.remove(self.filepath)
+        os.remove(index_path(self.filepath))
+
+class IndexedMembers:
+    """Read-only, memory-mapped access to an indexed members file"""
+    
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._ranges = None
+        with open(filepath, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(index_path(filepath), 'rb') as f:
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, self.count = INDEX_HEADER.unpack_from(self._index, 0)
+        if magic != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"Not a members index: {index_path(filepath)}")
+        
+        self._ranges = memoryview(self._index)[INDEX_HEADER.size:].cast('Q')
+        if sys.byteorder != 'little':
+            # The index is little-endian on disk; fall back to a swapped copy
+            self._ranges = _swapped(self._ranges)
+        
+        # The role dictionary lives in the header, before the first member
+        header_end = self._ranges[0] if self.count else self._data.find(b'[\n') + 2
+        self.roles = json.loads(self._data[:header_end].decode('utf-8').rstrip() + ']}')['roles']
+    
+    def __len__(self):
+        return self.count
+    
+    def raw_slice(self, offset, limit):
+        """Return the JSON bytes of members [offset, offset + limit) without parsing them"""
+        offset = max(0, offset)
+        end = min(self.count, offset + max(0, limit))
+        return [self._data[self._ranges[2 * i]:self._ranges[2 * i + 1]] for i in range(offset, end)]
+    
+    def slice(self, offset, limit):
+        """Return members [offset, offset + limit) as compact records"""
+        return [json.loads(raw) for raw in self.raw_slice(offset, limit)]
+    
+    def pages(self, page_size=1000):
+        """Yield all members a page at a time, each page shaped like a compact members file"""
+        for offset in range(0, self.count, page_size):
+            yield {'format': COMPACT_FORMAT, 'roles': self.roles, 'members': self.slice(offset, page_size)}
+    
+    def close(self):
+        if isinstance(self._ranges, memoryview):
+            self._ranges.release()
+        self._data.close()
+        self._index.close()
+
+def _swapped(ranges):
+    from array import array
+    swapped = array('Q', ranges)
+    swapped.byteswap()
+    return swapped
+
+def has_index(filepath):
+    """Check whether a members file has an up-to-date offset index next to it"""
+    idx = index_path(filepath)
+    # An index older than its data file belongs to a previous version of it
+    return os.path.exists(idx) and os.path.getmtime(idx) >= os.path.getmtime(filepath)
@@ -0,0 +1,169 @@
+import os
+import time
+from discord.ext import commands, tasks
+from src.activity import engine as activity_engine
+from src.presence import tracker as presence_tracker
+from src.voice import tracker as voice_tracker
+from src.shards import stats as shard_stats
+from src.config import ACTIVITY_FILE, ACTIVITY_SAVE_INTERVAL, PRESENCE_TRACKING, PRESENCE_PEAKS_FILE, VOICE_SESSION_LOG, MEMBER_CACHE
+
+class ActivityListeners(commands.Cog):
+    """Feeds message and voice events into the activity engine and voice tracker"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+    
+    async def cog_load(self):
+        """Restore the persisted counters and voice sessions; runs once, when the cog is added"""
+        if os.path.exists(ACTIVITY_FILE):
+            try:
+                activity_engine.restore(ACTIVITY_FILE)
+                print(f"Activity data restored from {ACTIVITY_FILE}")
+            except Exception as e:
+                print(f"Error restoring activity data: {e}")
+        
+        if os.path.exists(VOICE_SESSION_LOG):
+            try:
+                voice_tracker.replay(VOICE_SESSION_LOG)
+            except Exception as e:
+                print(f"Error replaying voice sessions: {e}")
+        voice_tracker.open_log(VOICE_SESSION_LOG)
+        
+        # Members already in voice when the bot connects start their sessions now
+        now = time.time()
+        for guild in self.bot.guilds:
+            for channel in guild.voice_channels:
+                for member in channel.members:
+                    voice_tracker.join(channel.id, member.id, channel.name, member.display_name, now)
+        
+        self.save_activity.start()
+    
+    def cog_unload(self):
+        self.save_activity.cancel()
+        activity_engine.save(ACTIVITY_FILE)
+        voice_tracker.close()
+    
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        """Count a guild message toward its channel's activity"""
+        if message.guild is None:
+            return
+        shard_stats.record_event(message.guild.shard_id)
+        activity_engine.record_message(message.channel.id, message.channel.name, message.created_at.timestamp())
+    
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        """Close the member's voice session when they leave or move channels"""
+        shard_stats.record_event(member.guild.shard_id)
+        if before.channel == after.channel:
+            # Mute, deafen or stream changes
+            return
+        
+        now = time.time()
+        if before.channel is not None:
+            session = voice_tracker.leave(before.channel.id, member.id, now)
+            if session:
+                activity_engine.record_voice(before.channel.id, *session, before.channel.name)
+        
+        if after.channel is not None:
+            voice_tracker.join(after.channel.id, member.id, after.channel.name, member.display_name, now)
+    
+    @tasks.loop(seconds=ACTIVITY_SAVE_INTERVAL)
+    async def save_activity(self):
+        """Persist the activity counters periodically"""
+        try:
+            # A few KB per channel; written on the loop so no event updates the counters mid-write
+            activity_engine.save(ACTIVITY_FILE)
+            voice_tracker.flush()
+        except Exception as e:
+            print(f"Error saving activity data: {e}")
+    
+    @save_activity.before_loop
+    async def before_save_activity(self):
+        await self.bot.wait_until_ready()
+
+class ShardListeners(commands.Cog):
+    """Counts connects and disconnects per gateway shard"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @commands.Cog.listener()
+    async def on_shard_connect(self, shard_id):
+        """Count a shard opening its gateway connection"""
+        shard_stats.record_connect(shard_id)
+    
+    @commands.Cog.listener()
+    async def on_shard_disconnect(self, shard_id):
+        """Count a shard losing its gateway connection"""
+        shard_stats.record_disconnect(shard_id)
+        print(f"Shard {shard_id} disconnected")
+    
+    @commands.Cog.listener()
+    async def on_shard_resumed(self, shard_id):
+        """Count a shard resuming its session after a reconnect"""
+        shard_stats.record_connect(shard_id)
+
+class PresenceListeners(commands.Cog):
+    """Keeps the presence tracker's online set and transition log current"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+    
+    async def cog_load(self):
+        """Restore the daily peaks and take the startup scan; runs once, when the cog is added"""
+        if os.path.exists(PRESENCE_PEAKS_FILE):
+            try:
+                presence_tracker.restore_peaks(PRESENCE_PEAKS_FILE)
+            except Exception as e:
+                print(f"Error restoring presence peaks: {e}")
+        presence_tracker.open_log()
+        
+        # One scan at startup; after that only presence events touch the tracker
+        for guild in self.bot.guilds:
+            if MEMBER_CACHE == 'lazy' and not guild.chunked:
+                # The scan needs the full member list; a later on-demand chunk would not reach the tracker
+                await guild.chunk()
+            for member in guild.members:
+                presence_tracker.update(member.id, member.status, member.name, member.display_name)
+        print(f"Presence tracking started with {len(presence_tracker.online)} members online")
+        
+        self.save_presence.start()
+    
+    def cog_unload(self):
+        self.save_presence.cancel()
+        presence_tracker.save_peaks(PRESENCE_PEAKS_FILE)
+        presence_tracker.close()
+    
+    @commands.Cog.listener()
+    async def on_presence_update(self, before, after):
+        """Record a member's status change"""
+        shard_stats.record_event(after.guild.shard_id)
+        if before.status != after.status:
+            presence_tracker.update(after.id, after.status, after.name, after.display_name)
+    
+    @tasks.loop(seconds=ACTIVITY_SAVE_INTERVAL)
+    async def save_presence(self):
+        """Flush the transition log and persist the daily peaks"""
+        try:
+            presence_tracker.flush()
+            presence_tracker.save_peaks(PRESENCE_PEAKS_FILE)
+        except Exception as e:
+            print(f"Error saving presence data: {e}")
+    
+    @save_presence.before_loop
+    async def before_save_presence(self):
+        await self.bot.wait_until_ready()
+
+async def setup(bot):
+    """Add the listener cogs to the bot
+    
+    on_ready fires again after a failed resume; cogs that are already loaded
+    keep their live state and are not added twice.
+    """
+    if bot.get_cog('ActivityListeners') is None:
+        await bot.add_cog(ActivityListeners(bot))
+    if bot.get_cog('ShardListeners') is None:
+        await bot.add_cog(ShardListeners(bot))
+    if PRESENCE_TRACKING and bot.get_cog('PresenceListeners') is None:
+        await bot.add_cog(PresenceListeners(bot))
@@ -0,0 +1,65 @@
+# Members files come in two shapes:
+#
+# Legacy: a list of member objects, each embedding its roles as
+#     {"id": ..., "name": ...} objects.
+#
+# Compact ("members-v2"): role names are stored once in a role dictionary and
+# each member lists its roles as indexes into it:
+#     {"format": "members-v2",
+#      "roles": [{"id": ..., "name": ...}, ...],
+#      "members": [{..., "roles": [0, 3]}, ...]}
+#
+# Index arrays are used rather than bitsets because they stay readable JSON
+# and most members hold only a handful of roles.
+
+COMPACT_FORMAT = 'members-v2'
+
+def is_compact(data):
+    """Check whether members data uses the compact encoding"""
+    return isinstance(data, dict) and data.get('format') == COMPACT_FORMAT
+
+def compact_members(members, roles=None):
+    """Encode legacy member records with a shared role dictionary
+    
+    roles optionally fixes the dictionary order (e.g. the guild's role list);
+    roles only seen on members are appended.
+    """
+    if is_compact(members):
+        return members
+    
+    role_table = []
+    role_index = {}
+    
+    def index_of(role):
+        if role['id'] not in role_index:
+            role_index[role['id']] = len(role_table)
+            role_table.append({'id': role['id'], 'name': role['name']})
+        return role_index[role['id']]
+    
+    for role in roles or []:
+        index_of(role)
+    
+    compact = []
+    for member in members if isinstance(members, list) else []:
+        if 'roles' in member:
+            member = dict(member, roles=[index_of(role) for role in member['roles']])
+        compact.append(member)
+    
+    return {'format': COMPACT_FORMAT, 'roles': role_table, 'members': compact}
+
+def expand_members(data):
+    """Decode members data to the legacy list-of-objects shape"""
+    if not is_compact(data):
+        return data
+    
+    roles = data['roles']
+    return [
+        dict(member, roles=[roles[i] for i in member['roles']]) if 'roles' in member else member
+        for member in data['members']
+    ]
+
+def record_count(data):
+    """Return the number of records in an export file's data, or None if unavailable"""
+    if is_compact(data):
+        return len(data['members'])
+    return len(data) if isinstance(data, list) else None
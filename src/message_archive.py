@@ -0,0 +1,76 @@
+import os
+import gzip
+import json
+from src.config import MESSAGE_ARCHIVE_DIR, MESSAGE_SEGMENT_BYTES
+
+CURSORS_FILE = 'cursors.json'
+SEGMENT_SUFFIX = '.jsonl.gz'
+
+def channel_dir(channel_id):
+    """Return the directory holding one channel's archive segments"""
+    return os.path.join(MESSAGE_ARCHIVE_DIR, str(channel_id))
+
+def list_segments(channel_id):
+    """Return a channel's segment paths, oldest first"""
+    path = channel_dir(channel_id)
+    if not os.path.isdir(path):
+        return []
+    return [os.path.join(path, f) for f in sorted(os.listdir(path)) if f.endswith(SEGMENT_SUFFIX)]
+
+def archived_channels():
+    """Return the IDs of every channel with archived messages"""
+    if not os.path.isdir(MESSAGE_ARCHIVE_DIR):
+        return []
+    return sorted(int(f) for f in os.listdir(MESSAGE_ARCHIVE_DIR) if f.isdigit())
+
+def load_cursors():
+    """Return {channel_id: last archived message ID}"""
+    try:
+        with open(os.path.join(MESSAGE_ARCHIVE_DIR, CURSORS_FILE), 'r', encoding='utf-8') as f:
+            return {int(k): v for k, v in json.load(f).items()}
+    except FileNotFoundError:
+        return {}
+
+def save_cursors(cursors):
+    """Persist the cursors atomically so an interrupted run never loses or skips messages"""
+    os.makedirs(MESSAGE_ARCHIVE_DIR, exist_ok=True)
+    path = os.path.join(MESSAGE_ARCHIVE_DIR, CURSORS_FILE)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({str(k): v for k, v in cursors.items()}, f)
+    os.replace(tmp_path, path)
+
+def append_messages(channel_id, messages):
+    """Append message records to the channel's current segment and return its path
+
+    Each call adds one gzip member to the segment, so earlier data is never
+    rewritten; a new segment is started once the current one passes
+    MESSAGE_SEGMENT_BYTES.
+    """
+    path = channel_dir(channel_id)
+    os.makedirs(path, exist_ok=True)
+
+    segments = list_segments(channel_id)
+    if segments and os.path.getsize(segments[-1]) < MESSAGE_SEGMENT_BYTES:
+        segment = segments[-1]
+    else:
+        segment = os.path.join(path, f'{len(segments):06d}{SEGMENT_SUFFIX}')
+
+    payload = ''.join(json.dumps(m, ensure_ascii=False) + '\n' for m in messages).encode('utf-8')
+    with open(segment, 'ab') as f:
+        f.write(gzip.compress(payload))
+        f.flush()
+        os.fsync(f.fileno())
+    return segment
+
+def iter_segment(segment):
+    """Yield the message records stored in one segment"""
+    with gzip.open(segment, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def iter_messages(channel_id):
+    """Yield a channel's archived messages, oldest first"""
+    for segment in list_segments(channel_id):
+        yield from iter_segment(segment)
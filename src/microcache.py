@@ -0,0 +1,79 @@
+import time
+import threading
+
+class MicroCache:
+    """Short-TTL cache for expensive responses shared by many pollers
+    
+    A fresh entry is served as is. A stale one (older than `ttl` but within
+    `ttl + stale_ttl`) is served immediately while a single background
+    refresh runs. A missing or expired entry is computed once, and
+    concurrent callers for the same key wait for that computation instead
+    of starting their own.
+    """
+    
+    def __init__(self, ttl, stale_ttl=0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = {}  # Key -> (value, computed at)
+        self._inflight = {}  # Key -> threading.Event for the computation in progress
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'coalesced': 0, 'refreshes': 0, 'errors': 0, 'last_compute_seconds': None}
+    
+    def get(self, key, compute):
+        """Return (value, state) where state is 'hit', 'stale', 'miss' or 'coalesced'"""
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                age = time.monotonic() - entry[1] if entry else None
+                
+                if entry and age < self.ttl:
+                    self.stats['hits'] += 1
+                    return entry[0], 'hit'
+                
+                if entry and age < self.ttl + self.stale_ttl:
+                    self.stats['stale_hits'] += 1
+                    if key not in self._inflight:
+                        self._inflight[key] = threading.Event()
+                        self.stats['refreshes'] += 1
+                        threading.Thread(target=self._refresh, args=(key, compute), daemon=True).start()
+                    return entry[0], 'stale'
+                
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    self.stats['misses'] += 1
+                    leader = True
+                else:
+                    self.stats['coalesced'] += 1
+                    leader = False
+            
+            if leader:
+                return self._refresh(key, compute), 'miss'
+            
+            event.wait()
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[1] < self.ttl + self.stale_ttl:
+                return entry[0], 'coalesced'
+            # The computation we waited on failed; try again ourselves
+    
+    def _refresh(self, key, compute):
+        start = time.monotonic()
+        try:
+            value = compute()
+            with self._lock:
+                self._entries[key] = (value, time.monotonic())
+                self.stats['last_compute_seconds'] = round(time.monotonic() - start, 3)
+            return value
+        except Exception:
+            with self._lock:
+                self.stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+    
+    def snapshot(self):
+        """Return the statistics plus the cache settings"""
+        with self._lock:
+            return dict(self.stats, ttl=self.ttl, stale_ttl=self.stale_ttl, entries=len(self._entries))
@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import struct
+from datetime import datetime, timezone
+from src.config import PRESENCE_LOG, PRESENCE_PEAKS_FILE
+from src.bot_ipc import ipc_handler
+
+# Same order as the columnar member snapshot's status codes
+STATUS_CODES = ['unknown', 'online', 'idle', 'dnd', 'offline', 'invisible']
+OFFLINE_CODES = {STATUS_CODES.index('offline'), STATUS_CODES.index('invisible')}
+
+# One status transition: Unix seconds, member ID, status code
+RECORD = struct.Struct('<IQB')
+
+def status_code(status):
+    status = str(status)
+    return STATUS_CODES.index(status) if status in STATUS_CODES else 0
+
+def day_key(t):
+    return datetime.fromtimestamp(t, timezone.utc).strftime('%Y-%m-%d')
+
+class PresenceTracker:
+    """Members currently online, kept up to date from presence events
+    
+    Every status change is appended to a binary log of fixed-size records,
+    and the peak online count of each UTC day is updated as changes arrive.
+    """
+    
+    def __init__(self):
+        self.online = {}  # Member ID -> status code, online members only
+        self.names = {}  # Member ID -> (name, display name)
+        self.daily_peaks = {}  # 'YYYY-MM-DD' -> {'peak': count, 'at': ISO time}
+        self._log = None
+    
+    def open_log(self, path=PRESENCE_LOG):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._log = open(path, 'ab')
+    
+    def flush(self):
+        if self._log:
+            self._log.flush()
+    
+    def close(self):
+        if self._log:
+            self._log.close()
+            self._log = None
+    
+    def update(self, member_id, status, name=None, display_name=None, t=None):
+        """Record a member's new status; returns False if it did not change"""
+        t = time.time() if t is None else t
+        code = status_code(status)
+        if name:
+            self.names[member_id] = (name, display_name or name)
+        
+        if code in OFFLINE_CODES:
+            if self.online.pop(member_id, None) is None:
+                return False
+        else:
+            if self.online.get(member_id) == code:
+                return False
+            self.online[member_id] = code
+        
+        if self._log:
+            self._log.write(RECORD.pack(int(t), member_id, code))
+        self._update_peak(t)
+        return True
+    
+    def _update_peak(self, t):
+        day = day_key(t)
+        peak = self.daily_peaks.get(day)
+        if peak is None or len(self.online) > peak['peak']:
+            self.daily_peaks[day] = {'peak': len(self.online), 'at': datetime.fromtimestamp(t, timezone.utc).isoformat()}
+    
+    def online_now(self):
+        """Return the online members, without touching the member list"""
+        return [
+            {
+                'id': str(member_id),
+                'name': self.names.get(member_id, (None, None))[0],
+                'display_name': self.names.get(member_id, (None, None))[1],
+                'status': STATUS_CODES[code],
+            }
+            for member_id, code in self.online.items()
+        ]
+    
+    def peaks(self, days=30):
+        """Return the peak online count of the most recent days, newest first"""
+        return [dict(day=day, **self.daily_peaks[day]) for day in sorted(self.daily_peaks, reverse=True)[:days]]
+    
+    def save_peaks(self, path=PRESENCE_PEAKS_FILE):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.daily_peaks, f)
+        os.replace(tmp_path, path)
+    
+    def restore_peaks(self, path=PRESENCE_PEAKS_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            self.daily_peaks = json.load(f)
+
+def iter_transitions(path=PRESENCE_LOG, since=0):
+    """Yield (time, member_id, status) from the transition log"""
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(RECORD.size * 4096)
+            if not data:
+                break
+            # Ignore a partial record left by an interrupted write
+            usable = len(data) - len(data) % RECORD.size
+            for t, member_id, code in RECORD.iter_unpack(data[:usable]):
+                if t >= since:
+                    yield t, member_id, STATUS_CODES[code]
+            if usable < len(data):
+                break
+
+def load_peaks(path=PRESENCE_PEAKS_FILE):
+    """Return a tracker holding only the persisted daily peaks"""
+    loaded = PresenceTracker()
+    if os.path.exists(path):
+        try:
+            loaded.restore_peaks(path)
+        except Exception as e:
+            print(f"Error loading presence peaks: {e}")
+    return loaded
+
+# Live tracker owned by the bot process
+tracker = PresenceTracker()
+
+@ipc_handler('presence_online')
+async def ipc_presence_online(bot):
+    members = tracker.online_now()
+    return {'count': len(members), 'members': members}
+
+@ipc_handler('presence_peaks')
+async def ipc_presence_peaks(bot, days=30):
+    return {'peaks': tracker.peaks(int(days))}
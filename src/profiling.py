@@ -0,0 +1,169 @@
+import os
+import sys
+import time
+import cProfile
+import pstats
+import io
+import threading
+import functools
+from collections import Counter
+from datetime import datetime
+from src.config import (
+    PROFILE_ENABLED, PROFILE_DIR, PROFILE_MAX_FILES,
+    PROFILE_TOP_N, PROFILE_SAMPLE_INTERVAL
+)
+
+# Only one profiler may be active per thread
+_active = threading.local()
+
+class StackSampler:
+    """Periodically sample the call stack of one thread into collapsed stacks"""
+    
+    def __init__(self, thread_id, interval=PROFILE_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    def start(self):
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            
+            # Walk from the innermost frame outwards, then reverse so the root comes first
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+    
+    def collapsed(self):
+        """Return the samples in flamegraph.pl / speedscope collapsed format"""
+        return '\n'.join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + '\n'
+
+class Profiler:
+    """Capture a cProfile run and a sampled stack profile for one unit of work"""
+    
+    def __init__(self, name):
+        self.name = name
+        self.profile = cProfile.Profile()
+        self.sampler = StackSampler(threading.get_ident())
+        self.started = None
+        self.duration = None
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.sampler.start()
+        self.profile.enable()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.profile.disable()
+        self.sampler.stop()
+        self.duration = time.perf_counter() - self.started
+        try:
+            self.save()
+        except Exception as e:
+            print(f"Error saving profile {self.name}: {e}")
+        return False
+    
+    def top_functions(self, limit=PROFILE_TOP_N):
+        """Return the hottest functions as a printable pstats report"""
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.sort_stats('cumulative').print_stats(limit)
+        return stream.getvalue()
+    
+    def save(self):
+        """Write the top-N report and collapsed stacks to the profiles directory"""
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{self.name}")
+        
+        with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+            f.write(f"# {self.name} took {self.duration * 1000:.1f} ms\n")
+            f.write(self.top_functions())
+        
+        with open(f"{base}.collapsed", 'w', encoding='utf-8') as f:
+            f.write(self.sampler.collapsed())
+        
+        prune_profiles()
+        print(f"Profile saved to {base}.txt ({self.duration * 1000:.1f} ms)")
+
+def prune_profiles(max_files=PROFILE_MAX_FILES):
+    """Delete the oldest profile captures so the directory acts as a ring buffer"""
+    if not os.path.exists(PROFILE_DIR):
+        return
+    
+    # Each capture is a .txt/.collapsed pair sharing the same prefix
+    captures = sorted({os.path.splitext(f)[0] for f in os.listdir(PROFILE_DIR)})
+    for prefix in captures[:max(0, len(captures) - max_files)]:
+        for ext in ('.txt', '.collapsed'):
+            path = os.path.join(PROFILE_DIR, prefix + ext)
+            if os.path.exists(path):
+                os.remove(path)
+
+def _start_profiler(name):
+    """Return a Profiler for the current thread, or None if one is already running"""
+    if getattr(_active, 'profiling', False):
+        return None
+    return Profiler(name)
+
+def request_wants_profile(request):
+    """Check whether a Flask request should be profiled"""
+    if PROFILE_ENABLED:
+        return True
+    
+    # Per-request opt-in is restricted to admins
+    from src.auth import is_admin_request
+    return request.headers.get('X-Profile') == '1' and is_admin_request(request)
+
+def profile_route(name):
+    """Decorator that profiles a Flask view when profiling is requested"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            from flask import request
+            profiler = _start_profiler(name) if request_wants_profile(request) else None
+            if profiler is None:
+                return view(*args, **kwargs)
+            
+            _active.profiling = True
+            try:
+                with profiler:
+                    return view(*args, **kwargs)
+            finally:
+                _active.profiling = False
+        return wrapper
+    return decorator
+
+def profile_coroutine(name):
+    """Decorator that profiles a coroutine when PROFILE_ENABLED is set
+    
+    The profiler follows the event loop thread, so other tasks that run while
+    the coroutine is suspended are included in the capture.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            profiler = _start_profiler(name) if PROFILE_ENABLED else None
+            if profiler is None:
+                return await func(*args, **kwargs)
+            
+            _active.profiling = True
+            try:
+                with profiler:
+                    return await func(*args, **kwargs)
+            finally:
+                _active.profiling = False
+        return wrapper
+    return decorator
@@ -0,0 +1,116 @@
+import os
+import json
+from src.config import EXPORT_DIR
+from src.member_format import is_compact, expand_members
+from src.indexed_members import IndexedMembers, has_index
+
+# Named field sets for the common client views. ?fields= takes one of these
+# names or a comma-separated list of fields.
+PROJECTIONS = {
+    'channels': {
+        'widget': ['id', 'name', 'type'],
+        'table': ['id', 'name', 'type', 'position', 'category'],
+    },
+    'roles': {
+        'widget': ['id', 'name', 'color'],
+        'table': ['id', 'name', 'color', 'position', 'mentionable', 'hoist'],
+    },
+    'members': {
+        'widget': ['id', 'display_name', 'status'],
+        'table': ['id', 'name', 'display_name', 'joined_at', 'bot', 'roles', 'status'],
+    },
+    'events': {
+        'widget': ['id', 'name', 'start_time', 'status'],
+        'table': ['id', 'name', 'description', 'start_time', 'end_time', 'location', 'status'],
+    },
+}
+
+# Every field an ad hoc ?fields= list may name, per entity; 'all' is /api/all
+ENTITY_FIELDS = {
+    'channels': ['id', 'name', 'type', 'position', 'category'],
+    'roles': ['id', 'name', 'color', 'position', 'permissions', 'mentionable', 'hoist'],
+    'members': ['id', 'name', 'display_name', 'joined_at', 'bot', 'roles', 'status'],
+    'events': ['id', 'name', 'description', 'start_time', 'end_time', 'location', 'creator_id', 'status'],
+}
+ENTITY_FIELDS['all'] = sorted(set().union(*ENTITY_FIELDS.values()))
+
+def parse_fields(entity, value):
+    """Return (projection name, fields) for a ?fields= value
+    
+    The name is None for an ad hoc field list. Raises ValueError if no
+    field is given or a field is unknown.
+    """
+    if value in PROJECTIONS.get(entity, {}):
+        return value, PROJECTIONS[entity][value]
+    
+    fields = list(dict.fromkeys(f.strip() for f in (value or '').split(',') if f.strip()))
+    if not fields:
+        raise ValueError("fields must be a projection name or a comma-separated list of fields")
+    unknown = [f for f in fields if f not in ENTITY_FIELDS[entity]]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)} (available: {', '.join(ENTITY_FIELDS[entity])})")
+    return None, fields
+
+def project(data, fields):
+    """Keep only the given fields of each record
+    
+    Error placeholders pass through unchanged. Compact members keep their
+    encoding; the role dictionary is emptied unless roles were asked for.
+    """
+    if is_compact(data):
+        return dict(data, roles=data['roles'] if 'roles' in fields else [], members=project(data['members'], fields))
+    if not isinstance(data, list):
+        return data
+    return [
+        {f: record[f] for f in fields if f in record} if isinstance(record, dict) and 'error' not in record else record
+        for record in data
+    ]
+
+def _write_indexed_members(source, projections, paths):
+    """Write member projections from an indexed members file one page at a time"""
+    members = IndexedMembers(source)
+    outputs = {name: open(paths[name], 'w', encoding='utf-8') for name in projections}
+    try:
+        for f in outputs.values():
+            f.write('[')
+        count = 0
+        for page in members.pages():
+            records = expand_members(page)
+            for name, fields in projections.items():
+                for i, record in enumerate(project(records, fields)):
+                    outputs[name].write((',' if count + i else '') + json.dumps(record, separators=(',', ':')))
+            count += len(records)
+        for f in outputs.values():
+            f.write(']')
+    finally:
+        for f in outputs.values():
+            f.close()
+        members.close()
+
+def write_projections(files, timestamp):
+    """Write the named projections of an export next to its files
+    
+    Members are written in the legacy shape served by /api/members.
+    Returns {entity: {name: path}} for the summary.
+    """
+    written = {}
+    for entity, projections in PROJECTIONS.items():
+        if entity not in files:
+            continue
+        paths = {name: os.path.join(EXPORT_DIR, f'{entity}-{name}_{timestamp}.json') for name in projections}
+        written[entity] = paths
+        
+        if entity == 'members' and has_index(files[entity]):
+            # Streamed so large member lists are never loaded whole
+            _write_indexed_members(files[entity], projections, paths)
+            continue
+        
+        with open(files[entity], 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if entity == 'members':
+            data = expand_members(data)
+        
+        for name, fields in projections.items():
+            with open(paths[name], 'w', encoding='utf-8') as f:
+                json.dump(project(data, fields), f, separators=(',', ':'))
+    return written
@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime, timezone
+from src.bot_ipc import ipc_handler
+from src.rest_scheduler import scheduler, INTERACTIVE
+from src.activity import engine as activity_engine
+from src.presence import tracker as presence_tracker
+from src.voice import tracker as voice_tracker
+from src.shards import latency_ms, shard_report
+from src.config import PRESENCE_TRACKING, MEMBER_CACHE
+
+def online_member(member):
+    return {
+        'id': member.id,
+        'name': member.name,
+        'display_name': member.display_name,
+        'avatar_url': str(member.display_avatar.url) if hasattr(member, 'display_avatar') else None,
+        'status': str(member.status) if hasattr(member, 'status') else 'unknown'
+    }
+
+async def collect_realtime(bot):
+    """Collect real-time data about online members and active channels
+    
+    Must run on the bot's event loop.
+    """
+    if not bot or not bot.guilds:
+        return {"error": "Bot not connected", "status": "offline"}
+    
+    guild = bot.guilds[0]
+    
+    if MEMBER_CACHE == 'lazy' and not guild.chunked:
+        # The first request loads the member list; later ones read the cache
+        await guild.chunk()
+    
+    # Get online members
+    online_members = []
+    if PRESENCE_TRACKING:
+        # The presence tracker already holds the online set; only online members are looked up
+        for member_id in list(presence_tracker.online):
+            member = guild.get_member(member_id)
+            if member is not None:
+                online_members.append(online_member(member))
+    else:
+        for member in guild.members:
+            if hasattr(member, 'status') and str(member.status) != 'offline':
+                online_members.append(online_member(member))
+    
+    # Get active channels (channels with recent messages)
+    async def last_message(channel):
+        async for message in channel.history(limit=1):
+            return message
+        return None
+    
+    async def channel_activity(channel):
+        try:
+            # Channels the activity engine has seen a message in need no REST call
+            seen_at = activity_engine.last_message_at(channel.id)
+            if seen_at:
+                last_message_time = datetime.fromtimestamp(seen_at, timezone.utc).isoformat()
+            else:
+                # Concurrent requests for the same channel share one history call
+                message = await scheduler.submit(
+                    f'messages:{channel.id}', lambda: last_message(channel),
+                    priority=INTERACTIVE, key=f'last_message:{channel.id}'
+                )
+                if not message:
+                    return None
+                activity_engine.note_last_message(channel.id, message.created_at.timestamp(), channel.name)
+                last_message_time = message.created_at.isoformat()
+            
+            return {
+                'id': channel.id,
+                'name': channel.name,
+                'last_message_time': last_message_time,
+                'category': channel.category.name if channel.category else None
+            }
+        except Exception as e:
+            print(f"Error getting last message for channel {channel.name}: {e}")
+        return None
+    
+    results = await asyncio.gather(*(channel_activity(channel) for channel in guild.text_channels))
+    active_channels = [channel for channel in results if channel]
+    
+    # Sort active channels by last message time (most recent first)
+    active_channels.sort(key=lambda x: x.get('last_message_time', ''), reverse=True)
+    
+    # Voice channels with members, maintained from voice state events
+    active_voice_channels = voice_tracker.active_channels()
+    
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'guild_name': guild.name,
+        'guild_id': guild.id,
+        'total_members': guild.member_count,
+        'online_members': online_members,
+        'active_text_channels': active_channels,
+        'active_voice_channels': active_voice_channels
+    }
+
+@ipc_handler('realtime')
+async def ipc_realtime(bot):
+    return await collect_realtime(bot)
+
+@ipc_handler('status')
+async def ipc_status(bot):
+    """Report the bot's connection state to web workers"""
+    return {
+        'connected': bot.is_ready(),
+        'latency_ms': latency_ms(bot.latency) if bot.is_ready() else None,
+        'guilds': len(bot.guilds),
+        'sharding': shard_report(bot),
+    }
@@ -0,0 +1,165 @@
+import time
+import heapq
+import asyncio
+import itertools
+from src.config import REST_GLOBAL_RATE, REST_BUCKET_LIMITS, REST_MAX_RETRIES
+from src.bot_ipc import ipc_handler
+
+# Priority lanes: lower values are served first when a bucket is contended
+INTERACTIVE = 0
+BACKGROUND = 1
+
+LANE_NAMES = {INTERACTIVE: 'interactive', BACKGROUND: 'background'}
+
+class TokenBucket:
+    """Client-side token accounting for one Discord rate limit bucket
+
+    Waiters are served in (priority, arrival) order, so an interactive request
+    queued behind a background crawl gets the next token.
+    """
+
+    def __init__(self, limit, per):
+        self.limit = limit
+        self.rate = limit / per
+        self.tokens = float(limit)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._cond = asyncio.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.limit, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return now
+
+    def pause(self, seconds):
+        """Empty the bucket after a 429 so nothing else is sent until Discord's retry_after passes"""
+        self.tokens = 0.0
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    async def acquire(self, priority=BACKGROUND):
+        """Wait for a token; returns the seconds spent waiting"""
+        entry = (priority, next(self._seq))
+        start = time.monotonic()
+        async with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = self._refill()
+                    if self._waiters[0] == entry:
+                        if now >= self.blocked_until and self.tokens >= 1:
+                            heapq.heappop(self._waiters)
+                            self.tokens -= 1
+                            # Let the next waiter check for a token
+                            self._cond.notify_all()
+                            return now - start
+                        timeout = max(self.blocked_until - now, (1 - self.tokens) / self.rate, 0.001)
+                    else:
+                        timeout = None
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+
+class RestScheduler:
+    """Central gate for Discord REST calls made by exports and live views
+
+    Calls name a bucket ("route:major_id", e.g. "messages:1234") and go through
+    that bucket's token accounting plus a global bucket. Calls sharing a `key`
+    while one is in flight are coalesced into a single request.
+    """
+
+    def __init__(self, global_rate=REST_GLOBAL_RATE, bucket_limits=REST_BUCKET_LIMITS, max_retries=REST_MAX_RETRIES):
+        self.bucket_limits = bucket_limits
+        self.max_retries = max_retries
+        self.global_bucket = TokenBucket(global_rate, 1.0)
+        self.buckets = {}
+        self.inflight = {}
+        self.stats = {}
+
+    def _bucket(self, bucket):
+        if bucket not in self.buckets:
+            route = bucket.split(':', 1)[0]
+            limit, per = self.bucket_limits.get(route, self.bucket_limits['default'])
+            self.buckets[bucket] = TokenBucket(limit, per)
+        return self.buckets[bucket]
+
+    def _route_stats(self, bucket):
+        route = bucket.split(':', 1)[0]
+        if route not in self.stats:
+            self.stats[route] = {
+                'requests': 0, 'coalesced': 0, 'rate_limited': 0, 'errors': 0,
+                'wait_seconds': 0.0, 'max_wait_seconds': 0.0, 'request_seconds': 0.0,
+                'lanes': {name: 0 for name in LANE_NAMES.values()},
+            }
+        return self.stats[route]
+
+    async def submit(self, bucket, factory, priority=BACKGROUND, key=None):
+        """Run `await factory()` once a token for `bucket` is available and return its result"""
+        stats = self._route_stats(bucket)
+
+        if key is not None and key in self.inflight:
+            stats['coalesced'] += 1
+            return await asyncio.shield(self.inflight[key])
+
+        task = asyncio.ensure_future(self._run(bucket, factory, priority, stats))
+        if key is not None:
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _run(self, bucket, factory, priority, stats):
+        token_bucket = self._bucket(bucket)
+        stats['lanes'][LANE_NAMES.get(priority, str(priority))] += 1
+
+        for attempt in range(self.max_retries + 1):
+            waited = await token_bucket.acquire(priority)
+            waited += await self.global_bucket.acquire(priority)
+            stats['wait_seconds'] += waited
+            stats['max_wait_seconds'] = max(stats['max_wait_seconds'], waited)
+            stats['requests'] += 1
+
+            start = time.monotonic()
+            try:
+                return await factory()
+            except Exception as e:
+                if getattr(e, 'status', None) != 429 or attempt == self.max_retries:
+                    stats['errors'] += 1
+                    raise
+                # discord.py normally absorbs 429s itself; one reaching us means our limits are too loose
+                stats['rate_limited'] += 1
+                retry_after = float(getattr(e, 'retry_after', None) or 1.0)
+                token_bucket.pause(retry_after)
+                print(f"REST scheduler: 429 on {bucket}, retrying in {retry_after:.2f}s")
+            finally:
+                stats['request_seconds'] += time.monotonic() - start
+
+    def metrics(self):
+        """Return per-route request counters and the current bucket state"""
+        routes = {}
+        for route, stats in self.stats.items():
+            routes[route] = dict(stats, lanes=dict(stats['lanes']),
+                                 wait_seconds=round(stats['wait_seconds'], 3),
+                                 max_wait_seconds=round(stats['max_wait_seconds'], 3),
+                                 request_seconds=round(stats['request_seconds'], 3))
+        return {
+            'routes': routes,
+            'buckets': len(self.buckets),
+            'inflight': len(self.inflight),
+            'queued': sum(len(b._waiters) for b in self.buckets.values()),
+        }
+
+# Shared by every exporter and live view running on the bot's event loop
+scheduler = RestScheduler()
+
+@ipc_handler('rest_metrics')
+async def ipc_rest_metrics(bot):
+    return scheduler.metrics()
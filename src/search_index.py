@@ -0,0 +1,201 @@
+import os
+import json
+import gzip
+import html
+import zlib
+import sqlite3
+from urllib.request import pathname2url
+from src.config import SEARCH_DB
+from src import message_archive
+from src.member_format import expand_members
+from src.indexed_members import IndexedMembers, has_index
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(
+    kind UNINDEXED, ref UNINDEXED, title, body, tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS indexed_exports (kind TEXT PRIMARY KEY, path TEXT, mtime_ns INTEGER);
+CREATE TABLE IF NOT EXISTS indexed_segments (path TEXT PRIMARY KEY, size INTEGER);
+"""
+
+def connect(path=SEARCH_DB, readonly=False):
+    """Open the search database, creating the schema on first use
+    
+    A read-only connection neither creates the schema nor takes write locks,
+    so any number of web workers can search while one writer updates it.
+    """
+    if readonly:
+        return sqlite3.connect(f'file:{pathname2url(os.path.abspath(path))}?mode=ro', uri=True, timeout=30)
+    
+    conn = sqlite3.connect(path, timeout=30)
+    # WAL lets web workers keep searching while an export updates the index
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+def _load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def member_documents(path):
+    if has_index(path):
+        # Read a page at a time so large member lists are never loaded whole
+        reader = IndexedMembers(path)
+        try:
+            members = (member for page in reader.pages() for member in page['members'])
+            yield from _member_documents(members)
+        finally:
+            reader.close()
+        return
+    
+    data = _load_json(path)
+    if isinstance(data, list) and data and 'error' in data[0]:
+        return
+    yield from _member_documents(expand_members(data))
+
+def _member_documents(members):
+    for member in members:
+        names = ' '.join(dict.fromkeys(n for n in (member.get('display_name'), member.get('name')) if n))
+        yield {'id': str(member['id'])}, names, ''
+
+def channel_documents(path):
+    for channel in _load_json(path):
+        if 'name' in channel:
+            category = (channel.get('category') or {}).get('name') or ''
+            yield {'id': str(channel['id'])}, channel['name'], category
+
+def event_documents(path):
+    for event in _load_json(path):
+        if 'name' in event:
+            yield {'id': str(event['id']), 'start_time': event.get('start_time')}, event['name'], event.get('description') or ''
+
+# Export files replaced wholesale on every export: summary file key -> (document kind, documents)
+ENTITY_DOCUMENTS = {
+    'members': ('member', member_documents),
+    'channels': ('channel', channel_documents),
+    'events': ('event', event_documents),
+}
+
+def _index_entities(conn, files):
+    """Re-index each entity whose export file changed since the last update"""
+    updated = 0
+    for kind, (doc_kind, documents) in ENTITY_DOCUMENTS.items():
+        path = files.get(kind)
+        if not path or not os.path.exists(path):
+            continue
+
+        mtime_ns = os.stat(path).st_mtime_ns
+        row = conn.execute('SELECT path, mtime_ns FROM indexed_exports WHERE kind = ?', (kind,)).fetchone()
+        if row == (path, mtime_ns):
+            continue
+
+        with conn:
+            conn.execute('DELETE FROM documents WHERE kind = ?', (doc_kind,))
+            rows = ((doc_kind, json.dumps(ref), title, body) for ref, title, body in documents(path))
+            inserted = conn.executemany('INSERT INTO documents (kind, ref, title, body) VALUES (?, ?, ?, ?)', rows).rowcount
+            conn.execute('INSERT OR REPLACE INTO indexed_exports VALUES (?, ?, ?)', (kind, path, mtime_ns))
+        updated += inserted
+    return updated
+
+def _index_messages(conn):
+    """Index only the bytes appended to message segments since the last update"""
+    updated = 0
+    for channel_id in message_archive.archived_channels():
+        for segment in message_archive.list_segments(channel_id):
+            size = os.path.getsize(segment)
+            if size <= _indexed_size(conn, segment):
+                continue
+
+            try:
+                # Other workers may be indexing the same tail; the write lock makes one of them do it
+                conn.execute('BEGIN IMMEDIATE')
+                indexed_size = _indexed_size(conn, segment)
+                if size <= indexed_size:
+                    conn.rollback()
+                    continue
+
+                # Every append is a complete gzip member, so the new tail decompresses on its own
+                with open(segment, 'rb') as f:
+                    f.seek(indexed_size)
+                    tail = gzip.decompress(f.read(size - indexed_size)).decode('utf-8')
+
+                rows = []
+                for line in tail.splitlines():
+                    if not line.strip():
+                        continue
+                    message = json.loads(line)
+                    if not message.get('content'):
+                        continue
+                    ref = {
+                        'id': str(message['id']),
+                        'channel_id': str(message['channel_id']),
+                        'created_at': message['created_at'],
+                    }
+                    rows.append(('message', json.dumps(ref), message.get('author') or '', message['content']))
+
+                conn.executemany('INSERT INTO documents (kind, ref, title, body) VALUES (?, ?, ?, ?)', rows)
+                conn.execute('INSERT OR REPLACE INTO indexed_segments VALUES (?, ?)', (segment, size))
+                conn.commit()
+            except (OSError, EOFError, zlib.error, ValueError, KeyError) as e:
+                # A truncated or corrupt tail; it is retried on the next update
+                conn.rollback()
+                print(f"Error indexing message segment {segment}: {e}")
+                continue
+            updated += len(rows)
+    return updated
+
+def _indexed_size(conn, segment):
+    row = conn.execute('SELECT size FROM indexed_segments WHERE path = ?', (segment,)).fetchone()
+    return row[0] if row else 0
+
+def update_index(summary):
+    """Bring the index up to date with an export summary and the message archive
+
+    Returns the number of documents written; unchanged sources cost one stat each.
+    """
+    conn = connect()
+    try:
+        return _index_entities(conn, summary.get('files', {})) + _index_messages(conn)
+    finally:
+        conn.close()
+
+def fts_query(text):
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix"""
+    words = [w.replace('"', '') for w in text.split()]
+    words = [w for w in words if w]
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+# Placeholder match markers, swapped for <mark> tags once the snippet text is escaped
+MARK_START, MARK_END = '\x02', '\x03'
+
+def highlight(snippet):
+    """Return a snippet as HTML: the document text escaped, matches wrapped in <mark>"""
+    return html.escape(snippet).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+def search(text, kind=None, limit=20):
+    """Return ranked matches for `text`, best first"""
+    query = fts_query(text)
+    if query is None or not os.path.exists(SEARCH_DB):
+        return []
+
+    sql = (f"SELECT kind, ref, title, snippet(documents, 3, '{MARK_START}', '{MARK_END}', '…', 12), bm25(documents, 0, 0, 5.0, 1.0) "
+           "FROM documents WHERE documents MATCH ?")
+    params = [query]
+    if kind:
+        sql += ' AND kind = ?'
+        params.append(kind)
+    sql += ' ORDER BY 5 LIMIT ?'
+    params.append(limit)
+
+    conn = connect(readonly=True)
+    try:
+        return [
+            dict(json.loads(ref), type=doc_kind, title=title, snippet=highlight(snippet), score=round(-score, 3))
+            for doc_kind, ref, title, snippet, score in conn.execute(sql, params)
+        ]
+    finally:
+        conn.close()
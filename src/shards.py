@@ -0,0 +1,108 @@
+import math
+import time
+from collections import Counter
+from src.config import SHARDED, SHARD_COUNT, SHARD_IDS
+from src.activity import RingCounter
+from src.bot_ipc import ipc_handler
+
+# Event rates are averaged over this many one-second buckets
+RATE_WINDOW = 60
+
+def parse_shard_ids(value):
+    """Parse a shard list such as "0-3" or "0,2,5" into sorted shard IDs"""
+    shard_ids = set()
+    for part in value.split(','):
+        part = part.strip()
+        if '-' in part:
+            first, last = part.split('-', 1)
+            shard_ids.update(range(int(first), int(last) + 1))
+        elif part:
+            shard_ids.add(int(part))
+    return sorted(shard_ids)
+
+def shard_options():
+    """Return the keyword arguments for an AutoShardedBot, or None to run a single connection"""
+    if not (SHARDED or SHARD_COUNT or SHARD_IDS):
+        return None
+    
+    options = {}
+    if SHARD_COUNT:
+        options['shard_count'] = SHARD_COUNT
+    if SHARD_IDS:
+        if not SHARD_COUNT:
+            raise ValueError("SHARD_IDS requires SHARD_COUNT (the total number of shards across all processes)")
+        options['shard_ids'] = parse_shard_ids(SHARD_IDS)
+        if options['shard_ids'] != list(range(SHARD_COUNT)):
+            print("Warning: SHARD_IDS leaves out some shards; running other shards in separate processes is not "
+                  "supported, since they would share activity, presence, voice and export files")
+    return options
+
+class ShardStats:
+    """Gateway event rates and connection history per shard"""
+    
+    def __init__(self):
+        self.rates = {}  # Shard ID -> RingCounter of events per second
+        self.totals = Counter()
+        self.connects = Counter()
+        self.disconnects = Counter()
+        self.last_disconnect = {}  # Shard ID -> Unix time
+    
+    def record_event(self, shard_id, t=None):
+        t = time.time() if t is None else t
+        shard_id = shard_id or 0
+        if shard_id not in self.rates:
+            self.rates[shard_id] = RingCounter(1, RATE_WINDOW)
+        self.rates[shard_id].add(t)
+        self.totals[shard_id] += 1
+    
+    def record_connect(self, shard_id):
+        self.connects[shard_id] += 1
+    
+    def record_disconnect(self, shard_id, t=None):
+        self.disconnects[shard_id] += 1
+        self.last_disconnect[shard_id] = time.time() if t is None else t
+    
+    def events_per_second(self, shard_id, now=None):
+        ring = self.rates.get(shard_id)
+        if ring is None:
+            return 0.0
+        now = time.time() if now is None else now
+        # The current second is still filling, so average the complete ones before it
+        return round(ring.total(now - 1, RATE_WINDOW - 1) / (RATE_WINDOW - 1), 2)
+
+def latency_ms(latency):
+    # Latency is inf or nan until a shard's first heartbeat is acknowledged
+    return round(latency * 1000, 1) if math.isfinite(latency) else None
+
+def shard_report(bot, now=None):
+    """Return latency, guild count, event rate and connection state for each shard the bot runs"""
+    if hasattr(bot, 'latencies'):
+        latencies = dict(bot.latencies)
+    else:
+        latencies = {bot.shard_id or 0: bot.latency}
+    
+    guild_counts = Counter(guild.shard_id or 0 for guild in bot.guilds)
+    shard_info = getattr(bot, 'shards', {})
+    
+    report = []
+    for shard_id in sorted(set(latencies) | set(stats.rates)):
+        info = shard_info.get(shard_id)
+        report.append({
+            'id': shard_id,
+            'connected': not info.is_closed() if info is not None else bot.is_ready(),
+            'latency_ms': latency_ms(latencies.get(shard_id, math.inf)),
+            'guilds': guild_counts[shard_id],
+            'events_per_second': stats.events_per_second(shard_id, now),
+            'events_total': stats.totals[shard_id],
+            'connects': stats.connects[shard_id],
+            'disconnects': stats.disconnects[shard_id],
+            'last_disconnect': stats.last_disconnect.get(shard_id),
+        })
+    return {'shard_count': bot.shard_count or 1, 'shards': report}
+
+# Live statistics owned by the bot process
+stats = ShardStats()
+
+@ipc_handler('shards')
+async def ipc_shards(bot):
+    return shard_report(bot)
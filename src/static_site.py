@@ -0,0 +1,134 @@
+import os
+import json
+import gzip
+import hashlib
+from datetime import datetime
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from src.config import EXPORT_DIR, STATIC_SITE_DIR, STATIC_MEMBERS_PAGE_SIZE
+from src.views import build_dashboard_view
+from src.member_format import compact_members, expand_members, record_count
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
+
+# Files under data/ never change once written; everything else is re-validated
+HEADERS = """/data/*
+  Cache-Control: public, max-age=31536000, immutable
+/index.html
+  Cache-Control: public, max-age=300
+/manifest.json
+  Cache-Control: public, max-age=300
+"""
+
+def _load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _write(path, body):
+    """Write a file and its gzip copy for hosts that serve precompressed assets"""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+    with open(f'{path}.gz', 'wb') as f:
+        # mtime=0 keeps the compressed bytes identical across builds
+        f.write(gzip.compress(body, compresslevel=9, mtime=0))
+
+def _write_hashed(out_dir, name, data):
+    """Write JSON under a content-hashed filename and return its URL relative to the site root"""
+    body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    filename = f"{name}.{hashlib.sha256(body).hexdigest()[:12]}.json"
+    path = os.path.join(out_dir, 'data', filename)
+    if not os.path.exists(path):
+        _write(path, body)
+    return f'data/{filename}'
+
+def _latest_summary():
+    summaries = sorted(f for f in os.listdir(EXPORT_DIR) if f.startswith('summary_') and f.endswith('.json'))
+    return _load_json(os.path.join(EXPORT_DIR, summaries[-1])) if summaries else None
+
+def _prune(out_dir, keep):
+    """Delete data files referenced by neither the current nor the previous manifest"""
+    data_dir = os.path.join(out_dir, 'data')
+    for filename in os.listdir(data_dir):
+        if filename.removesuffix('.gz') not in keep:
+            os.remove(os.path.join(data_dir, filename))
+
+def build_static_site(summary=None, out_dir=STATIC_SITE_DIR):
+    """Render the dashboard and its JSON data to flat files for a static host or CDN
+    
+    JSON files get content-hashed names under data/ and can be cached forever;
+    index.html and manifest.json point at the current ones. Returns the
+    manifest.
+    """
+    summary = summary or _latest_summary()
+    if not summary:
+        raise ValueError("No export data found")
+    
+    files = summary.get('files', {})
+    os.makedirs(os.path.join(out_dir, 'data'), exist_ok=True)
+    
+    channels = _load_json(files['channels']) if 'channels' in files else []
+    roles = _load_json(files['roles']) if 'roles' in files else []
+    events = _load_json(files['events']) if 'events' in files else []
+    members = _load_json(files['members']) if 'members' in files else []
+    if isinstance(members, list) and members and 'error' in members[0]:
+        members = []
+    
+    urls = {
+        'summary': _write_hashed(out_dir, 'summary', summary),
+        'channels': _write_hashed(out_dir, 'channels', channels),
+        'roles': _write_hashed(out_dir, 'roles', roles),
+        'events': _write_hashed(out_dir, 'events', events),
+        'dashboard': _write_hashed(out_dir, 'dashboard', build_dashboard_view(roles, expand_members(members))),
+    }
+    
+    # Members in pages shaped like /api/members?format=compact&offset=&limit=
+    compact = compact_members(members)
+    total = len(compact['members'])
+    member_pages = []
+    for offset in range(0, max(total, 1), STATIC_MEMBERS_PAGE_SIZE):
+        page = {
+            'total': total, 'offset': offset, 'limit': STATIC_MEMBERS_PAGE_SIZE,
+            'roles': compact['roles'], 'members': compact['members'][offset:offset + STATIC_MEMBERS_PAGE_SIZE],
+        }
+        member_pages.append(_write_hashed(out_dir, f'members-{offset // STATIC_MEMBERS_PAGE_SIZE + 1:04d}', page))
+    
+    urls['stats'] = _write_hashed(out_dir, 'stats', {
+        'server_name': summary.get('server_name'),
+        'export_time': summary.get('export_time'),
+        'counts': {'channels': record_count(channels), 'roles': record_count(roles),
+                   'members': total, 'events': record_count(events)},
+    })
+    
+    manifest = {
+        'generated_at': datetime.now().isoformat(),
+        'export_time': summary.get('export_time'),
+        'files': urls,
+        'member_pages': member_pages,
+    }
+    
+    env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=select_autoescape())
+    html = env.get_template('index.html').render(
+        server_name=summary.get('server_name'),
+        data_urls={k: urls[k] for k in ('channels', 'dashboard', 'events')},
+    )
+    
+    # Keep the previous generation's files for clients still holding the old index.html
+    manifest_path = os.path.join(out_dir, 'manifest.json')
+    previous = _load_json(manifest_path) if os.path.exists(manifest_path) else {'files': {}, 'member_pages': []}
+    
+    _write(os.path.join(out_dir, 'index.html'), html.encode('utf-8'))
+    _write(manifest_path, json.dumps(manifest, indent=4).encode('utf-8'))
+    with open(os.path.join(out_dir, '_headers'), 'w', encoding='utf-8') as f:
+        f.write(HEADERS)
+    
+    keep = set()
+    for generation in (manifest, previous):
+        keep.update(os.path.basename(url) for url in list(generation['files'].values()) + generation['member_pages'])
+    _prune(out_dir, keep)
+    
+    print(f"Static site written to {out_dir} ({len(member_pages)} member pages)")
+    return manifest
+
+if __name__ == '__main__':
+    build_static_site()
@@ -0,0 +1,91 @@
+import base64
+import hashlib
+import zlib
+
+# Content-defined chunking on line boundaries: a chunk ends after a line whose
+# CRC32 is divisible by CHUNK_DIVISOR. Inserting or removing records only
+# changes the chunks around the edit, unlike fixed-size blocks which all shift.
+CHUNK_DIVISOR = 32
+MIN_CHUNK_BYTES = 256
+MAX_CHUNK_BYTES = 64 * 1024
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def split_chunks(data):
+    """Split bytes into content-defined chunks that always end on a newline"""
+    chunks = []
+    start = 0
+    position = 0
+    
+    while position < len(data):
+        end = data.find(b'\n', position)
+        end = len(data) if end == -1 else end + 1
+        size = end - start
+        
+        if size >= MAX_CHUNK_BYTES or (size >= MIN_CHUNK_BYTES and zlib.crc32(data[position:end]) % CHUNK_DIVISOR == 0):
+            chunks.append(data[start:end])
+            start = end
+        position = end
+    
+    if start < len(data):
+        chunks.append(data[start:])
+    
+    return chunks
+
+def chunk_hash(chunk):
+    """Return the strong hash used to match chunks between versions"""
+    return hashlib.blake2b(chunk, digest_size=16).hexdigest()
+
+def signatures(data):
+    """Return the chunk hashes of a file, in order"""
+    return [chunk_hash(chunk) for chunk in split_chunks(data)]
+
+def compute_delta(data, base_signatures):
+    """Encode data as copy operations against a base file plus literal bytes
+    
+    Returns (ops, literal_bytes). Each op is either {'copy': base_chunk_index}
+    or {'data': base64_literal}; consecutive literals are merged.
+    """
+    index = {}
+    for i, sig in enumerate(base_signatures):
+        index.setdefault(sig, i)
+    
+    ops = []
+    literal = bytearray()
+    literal_bytes = 0
+    
+    for chunk in split_chunks(data):
+        match = index.get(chunk_hash(chunk))
+        if match is None:
+            literal.extend(chunk)
+            literal_bytes += len(chunk)
+            continue
+        
+        if literal:
+            ops.append({'data': base64.b64encode(bytes(literal)).decode('ascii')})
+            literal = bytearray()
+        ops.append({'copy': match})
+    
+    if literal:
+        ops.append({'data': base64.b64encode(bytes(literal)).decode('ascii')})
+    
+    return ops, literal_bytes
+
+def apply_delta(base_data, ops):
+    """Rebuild a file from its base and a list of delta operations"""
+    base_chunks = split_chunks(base_data)
+    output = bytearray()
+    
+    for op in ops:
+        if 'copy' in op:
+            output.extend(base_chunks[op['copy']])
+        else:
+            output.extend(base64.b64decode(op['data']))
+    
+    return bytes(output)
@@ -0,0 +1,329 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+import time
+import uuid
+import zipfile
+from werkzeug.utils import secure_filename
+from src.config import (
+    EXPORT_DIR, UPLOAD_DIR, UPLOAD_CHUNK_SIZE, UPLOAD_MAX_ARCHIVE_BYTES, UPLOAD_EXPIRY_SECONDS,
+    UPLOAD_MAX_ENTRY_BYTES, UPLOAD_MAX_TOTAL_BYTES, UPLOAD_MAX_ENTRIES
+)
+from src import sync
+
+# Upload IDs are the SHA-256 of the archive, so a restarted client resumes the same upload
+UPLOAD_ID_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+CHUNK_NAME_PATTERN = re.compile(r'chunk_(\d+)')
+
+# Cache of export file hashes keyed by path, invalidated by mtime and size
+_hash_cache = {}
+
+class UploadError(Exception):
+    """Raised when an upload request is invalid or fails verification"""
+
+def _upload_path(upload_id):
+    """Return the working directory for an upload, validating the ID"""
+    if not UPLOAD_ID_PATTERN.match(upload_id or ''):
+        raise UploadError("Invalid upload id")
+    return os.path.join(UPLOAD_DIR, upload_id)
+
+def _load_meta(upload_id):
+    """Load the metadata of an existing upload"""
+    meta_path = os.path.join(_upload_path(upload_id), 'meta.json')
+    if not os.path.exists(meta_path):
+        raise UploadError(f"Unknown upload: {upload_id}")
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _received_chunks(upload_id):
+    """List the chunk indexes already stored for an upload"""
+    path = _upload_path(upload_id)
+    # Skips chunk_XXXXXX.tmp files left behind by an interrupted write
+    return sorted(int(m.group(1)) for m in (CHUNK_NAME_PATTERN.fullmatch(f) for f in os.listdir(path)) if m)
+
+def expire_uploads(now=None):
+    """Delete unfinished uploads that have received nothing for UPLOAD_EXPIRY_SECONDS"""
+    if not os.path.exists(UPLOAD_DIR):
+        return
+    
+    now = time.time() if now is None else now
+    for name in os.listdir(UPLOAD_DIR):
+        path = os.path.join(UPLOAD_DIR, name)
+        # Storing a chunk renames it into the directory, which updates the directory's mtime
+        if UPLOAD_ID_PATTERN.match(name) and now - os.path.getmtime(path) > UPLOAD_EXPIRY_SECONDS:
+            print(f"Deleting abandoned upload {name}")
+            shutil.rmtree(path, ignore_errors=True)
+
+def start_upload(sha256, size, chunk_size=None):
+    """Create (or resume) a chunked upload and report which chunks are present"""
+    sha256 = (sha256 or '').lower()
+    path = _upload_path(sha256)
+    
+    if not isinstance(size, int) or size <= 0:
+        raise UploadError("Archive size must be a positive integer")
+    if size > UPLOAD_MAX_ARCHIVE_BYTES:
+        raise UploadError(f"Archive exceeds the size limit of {UPLOAD_MAX_ARCHIVE_BYTES} bytes")
+    
+    try:
+        chunk_size = int(chunk_size or UPLOAD_CHUNK_SIZE)
+    except (TypeError, ValueError):
+        raise UploadError("Chunk size must be an integer")
+    if chunk_size <= 0 or chunk_size > UPLOAD_CHUNK_SIZE * 8:
+        raise UploadError("Unsupported chunk size")
+    
+    expire_uploads()
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, 'meta.json')
+    
+    if os.path.exists(meta_path):
+        meta = _load_meta(sha256)
+        if meta['size'] != size or meta['chunk_size'] != chunk_size:
+            # Same content hash with different framing; start over
+            shutil.rmtree(path)
+            os.makedirs(path)
+            meta = None
+    else:
+        meta = None
+    
+    if meta is None:
+        meta = {
+            'sha256': sha256,
+            'size': size,
+            'chunk_size': chunk_size,
+            'total_chunks': (size + chunk_size - 1) // chunk_size,
+        }
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+    
+    return upload_status(sha256)
+
+def upload_status(upload_id):
+    """Return the progress of an upload"""
+    meta = _load_meta(upload_id)
+    return {
+        'upload_id': upload_id,
+        'size': meta['size'],
+        'chunk_size': meta['chunk_size'],
+        'total_chunks': meta['total_chunks'],
+        'received': _received_chunks(upload_id),
+    }
+
+def store_chunk(upload_id, index, data, sha256):
+    """Verify and store one chunk of an upload"""
+    meta = _load_meta(upload_id)
+    
+    if index < 0 or index >= meta['total_chunks']:
+        raise UploadError(f"Chunk index out of range: {index}")
+    
+    expected_size = min(meta['chunk_size'], meta['size'] - index * meta['chunk_size'])
+    if len(data) != expected_size:
+        raise UploadError(f"Chunk {index} has {len(data)} bytes, expected {expected_size}")
+    
+    if hashlib.sha256(data).hexdigest() != (sha256 or '').lower():
+        raise UploadError(f"Checksum mismatch for chunk {index}")
+    
+    # Write under a temporary name so a partial chunk is never counted as received
+    chunk_path = os.path.join(_upload_path(upload_id), f'chunk_{index:06d}')
+    with open(chunk_path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(chunk_path + '.tmp', chunk_path)
+
+def _safe_member_path(root, name):
+    """Resolve an archive member name inside root, rejecting path traversal"""
+    target = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([target, os.path.realpath(root)]) != os.path.realpath(root):
+        raise UploadError(f"Archive entry escapes the export directory: {name}")
+    return target
+
+def _copy_limited(src, dst, limit, name):
+    """Copy a stream, failing as soon as more than limit bytes have been read"""
+    copied = 0
+    for block in iter(lambda: src.read(64 * 1024), b''):
+        copied += len(block)
+        if copied > limit:
+            raise UploadError(f"Archive entry too large: {name}")
+        dst.write(block)
+    return copied
+
+def extract_archive(zip_ref, staging_dir, strip_prefix=None):
+    """Extract a snapshot archive into a staging directory, validating every entry
+    
+    Entries are streamed one at a time with per-entry and total size caps, which
+    are enforced on the bytes actually decompressed rather than the sizes the
+    archive declares. strip_prefix removes a leading directory such as 'server_data/'.
+    """
+    entries = [info for info in zip_ref.infolist() if not info.is_dir()]
+    if len(entries) > UPLOAD_MAX_ENTRIES:
+        raise UploadError(f"Archive has too many entries ({len(entries)})")
+    
+    # Reject obviously oversized archives before decompressing anything
+    if sum(info.file_size for info in entries) > UPLOAD_MAX_TOTAL_BYTES:
+        raise UploadError("Archive exceeds the total size limit")
+    
+    extracted = []
+    remaining = UPLOAD_MAX_TOTAL_BYTES
+    for info in entries:
+        name = info.filename
+        if strip_prefix and name.startswith(strip_prefix):
+            name = name[len(strip_prefix):]
+        
+        if info.file_size > UPLOAD_MAX_ENTRY_BYTES:
+            raise UploadError(f"Archive entry too large: {info.filename}")
+        
+        target = _safe_member_path(staging_dir, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with zip_ref.open(info) as src, open(target, 'wb') as dst:
+            remaining -= _copy_limited(src, dst, min(UPLOAD_MAX_ENTRY_BYTES, remaining), info.filename)
+        extracted.append(os.path.relpath(target, staging_dir))
+    
+    return extracted
+
+def extract_and_publish(fileobj, strip_prefix=None):
+    """Extract a zip archive from a seekable file object and publish it into EXPORT_DIR"""
+    staging_dir = os.path.join(UPLOAD_DIR, f'staging_{uuid.uuid4().hex}')
+    os.makedirs(staging_dir)
+    try:
+        with zipfile.ZipFile(fileobj, 'r') as zip_ref:
+            names = extract_archive(zip_ref, staging_dir, strip_prefix)
+        return publish_snapshot(staging_dir, names)
+    except zipfile.BadZipFile as e:
+        raise UploadError(f"Invalid archive: {e}")
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+def publish_snapshot(staging_dir, names):
+    """Move staged files into EXPORT_DIR, summaries last so readers never see a partial snapshot"""
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    
+    # get_latest_export only looks at summary files, so publishing them last makes the switch atomic
+    ordered = sorted(names, key=lambda n: os.path.basename(n).startswith('summary_'))
+    for name in ordered:
+        target = _safe_member_path(EXPORT_DIR, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(os.path.join(staging_dir, name), target)
+    
+    return ordered
+
+def commit_upload(upload_id):
+    """Assemble, verify and publish a completed upload"""
+    meta = _load_meta(upload_id)
+    path = _upload_path(upload_id)
+    
+    missing = sorted(set(range(meta['total_chunks'])) - set(_received_chunks(upload_id)))
+    if missing:
+        raise UploadError(f"Upload incomplete, missing chunks: {missing[:20]}")
+    
+    # Reassemble the archive while verifying the whole-file checksum
+    archive_path = os.path.join(path, 'archive.zip')
+    digest = hashlib.sha256()
+    with open(archive_path, 'wb') as archive:
+        for index in range(meta['total_chunks']):
+            with open(os.path.join(path, f'chunk_{index:06d}'), 'rb') as chunk:
+                data = chunk.read()
+            digest.update(data)
+            archive.write(data)
+    
+    if digest.hexdigest() != meta['sha256']:
+        shutil.rmtree(path)
+        raise UploadError("Archive checksum mismatch, upload discarded")
+    
+    try:
+        with open(archive_path, 'rb') as archive:
+            return extract_and_publish(archive)
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+def _export_file_path(name):
+    """Return the path of a flat export file name, rejecting anything else"""
+    if not name or secure_filename(name) != name:
+        raise UploadError(f"Invalid file name: {name}")
+    return os.path.join(EXPORT_DIR, name)
+
+def cached_sha256(path):
+    """Hash an export file, reusing the previous digest if the file is unchanged"""
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _hash_cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    
+    digest = sync.file_sha256(path)
+    _hash_cache[path] = (key, digest)
+    return digest
+
+def find_delta_base(name):
+    """Return the newest export file of the same type as name, to diff against"""
+    file_type = name.split('_')[0]
+    if not os.path.exists(EXPORT_DIR):
+        return None
+    
+    candidates = sorted(
+        (f for f in os.listdir(EXPORT_DIR) if f.startswith(f'{file_type}_') and f.endswith('.json') and f != name),
+        reverse=True
+    )
+    
+    # Prefer the version exported just before this one (names sort by timestamp)
+    older = [f for f in candidates if f < name]
+    if older:
+        return older[0]
+    return candidates[0] if candidates else None
+
+def diff_manifest(manifest):
+    """Compare a client manifest ({name: sha256}) with EXPORT_DIR
+    
+    Returns the names the server is missing (or holds a different version of),
+    and for each a suggested base file the client may send a delta against.
+    """
+    missing = []
+    bases = {}
+    
+    for name, digest in sorted(manifest.items()):
+        path = _export_file_path(name)
+        if os.path.exists(path) and cached_sha256(path) == (digest or '').lower():
+            continue
+        
+        missing.append(name)
+        base = find_delta_base(name)
+        if base:
+            bases[name] = base
+    
+    return {'missing': missing, 'bases': bases}
+
+def file_signatures(name):
+    """Return the chunk signatures of an export file for delta encoding"""
+    path = _export_file_path(name)
+    if not os.path.exists(path):
+        raise UploadError(f"File not found: {name}")
+    
+    with open(path, 'rb') as f:
+        data = f.read()
+    
+    return {'name': name, 'sha256': cached_sha256(path), 'signatures': sync.signatures(data)}
+
+def store_delta(name, base, sha256, ops):
+    """Rebuild a file from a delta against an existing export file and publish it"""
+    base_path = _export_file_path(base)
+    target_path = _export_file_path(name)
+    
+    if not os.path.exists(base_path):
+        raise UploadError(f"Base file not found: {base}")
+    
+    with open(base_path, 'rb') as f:
+        base_data = f.read()
+    
+    try:
+        data = sync.apply_delta(base_data, ops)
+    except (IndexError, KeyError, ValueError, TypeError) as e:
+        raise UploadError(f"Invalid delta: {e}")
+    
+    if hashlib.sha256(data).hexdigest() != (sha256 or '').lower():
+        raise UploadError(f"Checksum mismatch after applying delta to {name}")
+    
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    with open(target_path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(target_path + '.tmp', target_path)
+    
+    return len(data)
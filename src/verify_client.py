@@ -0,0 +1,146 @@
+import asyncio
+import time
+import aiohttp
+
+class RemoteTarget:
+    """Send requests to a deployed API over one pooled aiohttp session"""
+    
+    def __init__(self, base_url, pool_size=8, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = None
+    
+    async def open(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.pool_size),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+    
+    async def close(self):
+        if self.session:
+            await self.session.close()
+    
+    async def request(self, method, path, headers=None):
+        """Return (status, headers, json_or_None) for a request"""
+        async with self.session.request(method, f"{self.base_url}{path}", headers=headers) as response:
+            data = None
+            if response.status != 304:
+                data = await response.json(content_type=None)
+            return response.status, dict(response.headers), data
+
+class LocalTarget:
+    """Send requests to an in-process Flask app through its test client (no network)"""
+    
+    def __init__(self, app=None):
+        self.app = app
+        self.base_url = 'local'
+    
+    async def open(self):
+        if self.app is None:
+            from src.web_app import app
+            self.app = app
+    
+    async def close(self):
+        pass
+    
+    async def request(self, method, path, headers=None):
+        def send():
+            response = self.app.test_client().open(path, method=method, headers=headers or {})
+            data = response.get_json(silent=True) if response.status_code != 304 else None
+            return response.status_code, dict(response.headers), data
+        
+        # Flask views are blocking; run them off the event loop so checks still overlap
+        return await asyncio.to_thread(send)
+
+class VerificationClient:
+    """Async client for the health, summary and counts checks used by the ops scripts
+    
+    Usage:
+        async with VerificationClient(url) as client:
+            report = await client.check_all()
+    
+    Pass url='local' to verify the Flask app in this process instead of a remote API.
+    """
+    
+    def __init__(self, url, app=None):
+        self.target = LocalTarget(app) if url == 'local' else RemoteTarget(url)
+        # Last ETag and body per path, for conditional requests
+        self._etags = {}
+    
+    async def __aenter__(self):
+        await self.target.open()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.target.close()
+        return False
+    
+    async def get(self, path):
+        """GET a JSON endpoint, reusing the cached body when the server answers 304"""
+        headers = {}
+        cached = self._etags.get(path)
+        if cached:
+            headers['If-None-Match'] = cached[0]
+        
+        status, response_headers, data = await self.target.request('GET', path, headers)
+        if status == 304 and cached:
+            return 200, cached[1]
+        
+        etag = response_headers.get('ETag')
+        if etag and status == 200:
+            self._etags[path] = (etag, data)
+        return status, data
+    
+    async def post(self, path):
+        status, _, data = await self.target.request('POST', path)
+        return status, data
+    
+    async def health(self):
+        return await self.get('/api/health')
+    
+    async def summary(self):
+        return await self.get('/api/summary')
+    
+    async def counts(self):
+        return await self.get('/api/counts')
+    
+    async def trigger_export(self):
+        return await self.post('/api/trigger_export')
+    
+    async def check_all(self):
+        """Run the health, summary and counts checks concurrently"""
+        results = await asyncio.gather(self.health(), self.summary(), self.counts(), return_exceptions=True)
+        return dict(zip(('health', 'summary', 'counts'), results))
+    
+    async def wait_for_data(self, timeout=120, initial_delay=1, max_delay=30, since=None):
+        """Poll /api/counts with exponential backoff until export data is available
+        
+        If since is given (an export_time string), wait for a newer export instead.
+        Returns the counts payload, or None on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        delay = initial_delay
+        
+        while True:
+            try:
+                status, data = await self.counts()
+                if status == 200 and data and 'error' not in data and data.get('export_time') != since:
+                    return data
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"Waiting for data: {e}")
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            
+            print(f"No data yet, retrying in {min(delay, remaining):.0f} seconds...")
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
+
+def print_counts(data):
+    """Print a counts payload the way the ops scripts report data"""
+    print(f"Server: {data.get('server_name')}")
+    print(f"Export time: {data.get('export_time')}")
+    for entity, count in data.get('counts', {}).items():
+        print(f"{entity.capitalize()}: {count if count is not None else 'unavailable'}")
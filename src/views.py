@@ -0,0 +1,60 @@
+from collections import Counter
+
+# Number of highest roles shown next to each member in the dashboard
+TOP_ROLES = 3
+
+def _as_records(data):
+    """Return a list of real records, dropping error placeholders"""
+    if not isinstance(data, list):
+        return []
+    return [item for item in data if isinstance(item, dict) and 'error' not in item]
+
+def build_dashboard_view(roles, members):
+    """Precompute the dashboard's role and member tables
+    
+    Roles are sorted by position (highest first) with their member counts.
+    Members are sorted by join date (newest first) and reference their top
+    roles by index into the roles list, so role names are sent only once.
+    """
+    roles = sorted(_as_records(roles), key=lambda r: r.get('position', 0), reverse=True)
+    role_index = {role['id']: i for i, role in enumerate(roles)}
+    
+    role_counts = Counter()
+    status_counts = Counter()
+    member_rows = []
+    
+    for member in _as_records(members):
+        indexes = sorted(
+            (role_index[r['id']] for r in member.get('roles', []) if r.get('id') in role_index)
+        )
+        role_counts.update(indexes)
+        status_counts[member.get('status') or 'unknown'] += 1
+        
+        member_rows.append({
+            'id': str(member.get('id')),
+            'name': member.get('name'),
+            'display_name': member.get('display_name'),
+            'bot': member.get('bot', False),
+            'joined_at': member.get('joined_at'),
+            'top_roles': indexes[:TOP_ROLES],
+            'role_count': len(indexes),
+        })
+    
+    # ISO timestamps sort chronologically as strings; members without one go last
+    member_rows.sort(key=lambda m: m['joined_at'] or '', reverse=True)
+    
+    role_rows = [{
+        'id': str(role['id']),
+        'name': role.get('name'),
+        'color': role.get('color'),
+        'position': role.get('position'),
+        'mentionable': role.get('mentionable', False),
+        'hoist': role.get('hoist', False),
+        'member_count': role_counts[i],
+    } for i, role in enumerate(roles)]
+    
+    return {
+        'roles': role_rows,
+        'members': member_rows,
+        'status_counts': dict(status_counts),
+    }
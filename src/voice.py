@@ -0,0 +1,150 @@
+import os
+import time
+import struct
+from collections import deque
+from src.config import VOICE_SESSION_LOG, VOICE_HISTORY_HOURS
+from src.bot_ipc import ipc_handler
+
+# One finished voice session: channel ID, member ID, start (Unix seconds), duration (seconds)
+RECORD = struct.Struct('<QQII')
+
+class VoiceTracker:
+    """Who is in which voice channel, maintained from voice state events
+    
+    Finished sessions are appended to a binary log; per-channel session
+    counts and totals cover all time, and sessions from the last
+    VOICE_HISTORY_HOURS are kept for occupancy history.
+    """
+    
+    def __init__(self):
+        self.occupancy = {}  # Channel ID -> {member ID: join time}
+        self.channel_names = {}
+        self.member_names = {}
+        self.totals = {}  # Channel ID -> [sessions, seconds]
+        self.recent = deque()  # (channel ID, start, end), oldest first
+        self._log = None
+    
+    def open_log(self, path=VOICE_SESSION_LOG):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._log = open(path, 'ab')
+    
+    def flush(self):
+        if self._log:
+            self._log.flush()
+    
+    def close(self):
+        if self._log:
+            self._log.close()
+            self._log = None
+    
+    def join(self, channel_id, member_id, channel_name=None, member_name=None, t=None):
+        t = time.time() if t is None else t
+        if channel_name:
+            self.channel_names[channel_id] = channel_name
+        if member_name:
+            self.member_names[member_id] = member_name
+        self.occupancy.setdefault(channel_id, {})[member_id] = t
+    
+    def leave(self, channel_id, member_id, t=None):
+        """End a member's session; returns its (start, end) or None if none was open"""
+        t = time.time() if t is None else t
+        members = self.occupancy.get(channel_id, {})
+        start = members.pop(member_id, None)
+        if not members:
+            self.occupancy.pop(channel_id, None)
+        if start is None:
+            return None
+        
+        if self._log:
+            self._log.write(RECORD.pack(channel_id, member_id, int(start), int(t - start)))
+        self._add_session(channel_id, start, t)
+        return start, t
+    
+    def _add_session(self, channel_id, start, end):
+        totals = self.totals.setdefault(channel_id, [0, 0.0])
+        totals[0] += 1
+        totals[1] += end - start
+        
+        self.recent.append((channel_id, start, end))
+        cutoff = time.time() - VOICE_HISTORY_HOURS * 3600
+        while self.recent and self.recent[0][2] < cutoff:
+            self.recent.popleft()
+    
+    def replay(self, path=VOICE_SESSION_LOG):
+        """Rebuild the session totals and recent history from the log"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        usable = len(data) - len(data) % RECORD.size
+        for channel_id, _, start, duration in RECORD.iter_unpack(data[:usable]):
+            self._add_session(channel_id, start, start + duration)
+    
+    def active_channels(self):
+        """Return the occupied voice channels, busiest first"""
+        channels = [
+            {
+                'id': channel_id,
+                'name': self.channel_names.get(channel_id),
+                'member_count': len(members),
+                'members': [{'id': m, 'name': self.member_names.get(m)} for m in members],
+            }
+            for channel_id, members in self.occupancy.items()
+        ]
+        channels.sort(key=lambda c: c['member_count'], reverse=True)
+        return channels
+    
+    def history(self, hours=24, channel_id=None, now=None):
+        """Return hourly average occupancy and session statistics per channel
+        
+        Open sessions count up to `now`.
+        """
+        now = time.time() if now is None else now
+        hours = min(hours, VOICE_HISTORY_HOURS)
+        first_hour = int(now // 3600) - hours + 1
+        
+        sessions = list(self.recent)
+        sessions += [(c, start, now) for c, members in self.occupancy.items() for start in members.values()]
+        
+        occupancy = {}
+        for c, start, end in sessions:
+            if channel_id is not None and c != channel_id:
+                continue
+            seconds = occupancy.setdefault(c, [0.0] * hours)
+            for hour in range(max(int(start // 3600), first_hour), int(end // 3600) + 1):
+                overlap = min(end, (hour + 1) * 3600) - max(start, hour * 3600)
+                if overlap > 0:
+                    seconds[hour - first_hour] += overlap
+        
+        if channel_id is None:
+            channel_ids = sorted(set(occupancy) | set(self.totals))
+        else:
+            channel_ids = [channel_id] if channel_id in occupancy or channel_id in self.totals else []
+        
+        result = []
+        for c in channel_ids:
+            count, total = self.totals.get(c, (0, 0.0))
+            result.append({
+                'id': str(c),
+                'name': self.channel_names.get(c),
+                'sessions': count,
+                'average_session_seconds': round(total / count, 1) if count else None,
+                'current_members': len(self.occupancy.get(c, {})),
+                'hourly_occupancy': [round(s / 3600, 2) for s in occupancy.get(c, [0.0] * hours)],
+            })
+        return {'hours': hours, 'start': first_hour * 3600, 'channels': result}
+
+def load_sessions(path=VOICE_SESSION_LOG):
+    """Return a tracker rebuilt from the session log, without live occupancy"""
+    loaded = VoiceTracker()
+    if os.path.exists(path):
+        try:
+            loaded.replay(path)
+        except Exception as e:
+            print(f"Error loading voice sessions: {e}")
+    return loaded
+
+# Live tracker owned by the bot process
+tracker = VoiceTracker()
+
+@ipc_handler('voice_history')
+async def ipc_voice_history(bot, hours=24, channel_id=None):
+    return tracker.history(int(hours), int(channel_id) if channel_id else None)
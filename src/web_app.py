@@ -1,11 +1,30 @@
 import os
+import re
 import json
-import zipfile
 import threading
 import asyncio
-from flask import Flask, render_template, jsonify, request, send_from_directory
+import time
+import hashlib
+from flask import Flask, render_template, jsonify, request, send_from_directory, redirect, make_response, url_for
 from flask_cors import CORS
-from src.config import EXPORT_DIR
+from src.config import EXPORT_DIR, BOT_IPC_SOCKET, BOT_IPC_TIMEOUT, SERVE_MODE, WARMUP_ENABLED, HEALTH_CACHE_TTL, ACTIVITY_FILE, PRESENCE_TRACKING, PRESENCE_PEAKS_FILE, VOICE_SESSION_LOG
+from src.config import REALTIME_CACHE_TTL, REALTIME_STALE_TTL, SNAPSHOT_CACHE_CONTROL, LATEST_MAX_AGE
+from src.microcache import MicroCache
+from src.auth import is_admin_request, admin_required
+from src.profiling import profile_route
+from src import uploads
+from src import bot_ipc
+from src.realtime import collect_realtime
+from src import search_index
+from src import activity
+from src import presence
+from src import voice
+from src.shards import latency_ms, shard_report
+from src.rest_scheduler import scheduler as rest_scheduler
+from src.views import build_dashboard_view
+from src.projections import PROJECTIONS, parse_fields, project
+from src.member_format import COMPACT_FORMAT, compact_members, expand_members, record_count
+from src.indexed_members import IndexedMembers, has_index
 from werkzeug.utils import secure_filename
 from datetime import datetime
 from collections import Counter
@@ -17,6 +36,34 @@ os.makedirs(EXPORT_DIR, exist_ok=True)
 bot_started = False
 bot_instance = None
 
+def attach_bot(bot):
+    """Link a bot running in this process to the web app"""
+    global bot_started, bot_instance
+    bot_started = True
+    bot_instance = bot
+
+def get_bot():
+    """Return the in-process bot, linking it on first use rather than at import time
+    
+    Returns None in snapshot mode and for IPC web workers, which never import discord.py.
+    """
+    global bot_started, bot_instance
+    if SERVE_MODE == 'snapshot' or BOT_IPC_SOCKET:
+        return None
+    
+    if not bot_started:
+        bot_started = True
+        try:
+            # Import here to avoid circular imports
+            import importlib
+            main_module = importlib.import_module('main')
+            bot_instance = main_module.bot
+            # Don't start the bot here, it's already started in main.py
+            print("Discord bot instance connected from main module")
+        except Exception as e:
+            print(f"Error connecting to Discord bot: {e}")
+    return bot_instance
+
 def create_app():
     """Create and configure the Flask application"""
     app = Flask(__name__, 
@@ -26,23 +73,11 @@ def create_app():
     # Enable CORS for all routes and all origins
     CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=False)
     
-    # Start the Discord bot in a separate thread
-    def start_discord_bot():
-        global bot_started, bot_instance
-        if not bot_started:
-            bot_started = True
-            try:
-                # Import here to avoid circular imports
-                import importlib
-                main_module = importlib.import_module('main')
-                bot_instance = main_module.bot
-                # Don't start the bot here, it's already started in main.py
-                print("Discord bot instance connected from main module")
-            except Exception as e:
-                print(f"Error connecting to Discord bot: {e}")
-    
-    # Connect to the Discord bot when the app is created
-    start_discord_bot()
+    if BOT_IPC_SOCKET:
+        # Stateless web worker: the bot runs in its own process and is reached over IPC
+        print(f"Reading bot state from IPC socket {BOT_IPC_SOCKET}")
+    elif SERVE_MODE == 'snapshot':
+        print("Snapshot-only mode: serving exported data without a Discord bot")
     
     def get_latest_export():
         """Get the latest export summary file"""
@@ -50,12 +85,12 @@ def create_app():
             print(f"Export directory does not exist: {EXPORT_DIR}")
             return None
             
-        summary_files = [f for f in os.listdir(EXPORT_DIR) if f.startswith('summary_') and f.endswith('.json')]
+        summary_files = [f for f in list_export_files() if f.startswith('summary_') and f.endswith('.json')]
         
         if not summary_files:
             print(f"No summary files found in {EXPORT_DIR}")
             # Try to find any JSON files and create a summary
-            json_files = [f for f in os.listdir(EXPORT_DIR) if f.endswith('.json')]
+            json_files = [f for f in list_export_files() if f.endswith('.json')]
             if json_files:
                 print(f"Found {len(json_files)} JSON files in {EXPORT_DIR}")
                 # Extract timestamp from filenames (assuming format like 'channels_20250307_102809.json')
@@ -99,11 +134,14 @@ def create_app():
             return None
         
         # Sort by timestamp (which is part of the filename)
-        latest_summary = sorted(summary_files, reverse=True)[0]
+        latest_summary = os.path.join(EXPORT_DIR, sorted(summary_files, reverse=True)[0])
         
-        try:
-            with open(os.path.join(EXPORT_DIR, latest_summary), 'r', encoding='utf-8') as f:
+        def load_summary():
+            with open(latest_summary, 'r', encoding='utf-8') as f:
                 return json.load(f)
+        
+        try:
+            return cached_for_files('summary', [latest_summary], load_summary)
         except Exception as e:
             print(f"Error loading summary file: {e}")
             return None
@@ -120,6 +158,85 @@ def create_app():
             print(f"Error loading file {filepath}: {e}")
             return {"error": str(e)}
 
+    def load_members_file(filepath):
+        """Load members data in the encoding the client asked for
+        
+        ?format=compact returns the role dictionary plus per-member role indexes;
+        anything else gets the legacy shape with full role objects.
+        """
+        data = load_data_file(filepath)
+        if (isinstance(data, dict) and 'error' in data) or (isinstance(data, list) and data and 'error' in data[0]):
+            # Missing file or an export that could not read members
+            return data
+        if request.args.get('format') == 'compact':
+            return compact_members(data)
+        return expand_members(data)
+
+    # Memory-mapped members files, one per path; the OS page cache is shared across workers
+    open_members = {}
+    open_members_lock = threading.Lock()
+    
+    def get_indexed_members(filepath):
+        """Return a memory-mapped reader for a members file, or None if it has no index"""
+        if not has_index(filepath):
+            return None
+        
+        key = (filepath, os.stat(filepath).st_mtime_ns)
+        with open_members_lock:
+            if key not in open_members:
+                # Readers for older versions are only dropped, not closed: a request may still be
+                # slicing one, and its maps are released once the last reference goes away
+                for old_key in [k for k in open_members if k[0] == filepath]:
+                    del open_members[old_key]
+                open_members[key] = IndexedMembers(filepath)
+            return open_members[key]
+    
+    def members_page(filepath):
+        """Return one page of members (?offset=&limit=) without loading the whole file"""
+        try:
+            offset = max(0, int(request.args.get('offset', 0)))
+            limit = min(max(0, int(request.args.get('limit', 100))), 1000)
+        except ValueError:
+            return jsonify({"error": "offset and limit must be integers", "status": "error"}), 400
+        
+        try:
+            fields = parse_fields('members', request.args['fields'])[1] if 'fields' in request.args else None
+        except ValueError as e:
+            return jsonify({"error": str(e), "status": "error"}), 400
+        
+        compact = request.args.get('format') == 'compact'
+        indexed = get_indexed_members(filepath) if os.path.exists(filepath) else None
+        
+        if indexed is not None:
+            if compact and fields is None:
+                # Splice the stored JSON bytes straight into the response
+                body = b'{"total":%d,"offset":%d,"limit":%d,"roles":%s,"members":[%s]}' % (
+                    len(indexed), offset, limit,
+                    json.dumps(indexed.roles).encode('utf-8'),
+                    b','.join(indexed.raw_slice(offset, limit))
+                )
+                return app.response_class(body, mimetype='application/json')
+            
+            page = {"format": COMPACT_FORMAT, "roles": indexed.roles, "members": indexed.slice(offset, limit)}
+            total = len(indexed)
+        else:
+            data = load_data_file(filepath)
+            if isinstance(data, dict) and 'error' in data:
+                return jsonify(data), 500
+            data = compact_members(data)
+            total = len(data['members'])
+            page = dict(data, members=data['members'][offset:offset + limit])
+        
+        if fields is not None:
+            page = project(page, fields)
+        
+        result = {"total": total, "offset": offset, "limit": limit}
+        if compact:
+            result.update(roles=page['roles'], members=page['members'])
+        else:
+            result['members'] = expand_members(page)
+        return jsonify(result)
+
     @app.route('/')
     def index():
         """Render the main page"""
@@ -138,7 +255,9 @@ def create_app():
         if not summary:
             return jsonify({"error": "No export data found", "status": "waiting_for_data"})
         
-        return jsonify(summary)
+        response = jsonify(summary)
+        response.add_etag()
+        return response.make_conditional(request)
 
     @app.route('/api/channels')
     def api_channels():
@@ -148,8 +267,10 @@ def create_app():
         if not summary or 'files' not in summary or 'channels' not in summary['files']:
             return jsonify({"error": "No channels data found", "status": "waiting_for_data"})
         
-        channels_data = load_data_file(summary['files']['channels'])
-        return jsonify(channels_data)
+        path = summary['files']['channels']
+        if 'fields' in request.args:
+            return projected_response('channels', summary, 'channels', path, lambda: load_data_file(path))
+        return cached_json_response('channels', [path], lambda: load_data_file(path))
 
     @app.route('/api/roles')
     def api_roles():
@@ -159,10 +280,13 @@ def create_app():
         if not summary or 'files' not in summary or 'roles' not in summary['files']:
             return jsonify({"error": "No roles data found", "status": "waiting_for_data"})
         
-        roles_data = load_data_file(summary['files']['roles'])
-        return jsonify(roles_data)
+        path = summary['files']['roles']
+        if 'fields' in request.args:
+            return projected_response('roles', summary, 'roles', path, lambda: load_data_file(path))
+        return cached_json_response('roles', [path], lambda: load_data_file(path))
 
     @app.route('/api/members')
+    @profile_route('api_members')
     def api_members():
         """Return the latest members data"""
         summary = get_latest_export()
@@ -170,8 +294,14 @@ def create_app():
         if not summary or 'files' not in summary or 'members' not in summary['files']:
             return jsonify({"error": "No members data found", "status": "waiting_for_data"})
         
-        members_data = load_data_file(summary['files']['members'])
-        return jsonify(members_data)
+        if 'offset' in request.args or 'limit' in request.args:
+            return members_page(summary['files']['members'])
+        
+        path = summary['files']['members']
+        member_format = 'compact' if request.args.get('format') == 'compact' else 'legacy'
+        if 'fields' in request.args:
+            return projected_response(f'members:{member_format}', summary, 'members', path, lambda: load_members_file(path))
+        return cached_json_response(f'members:{member_format}', [path], lambda: load_members_file(path))
 
     @app.route('/api/events')
     def api_events():
@@ -181,10 +311,13 @@ def create_app():
         if not summary or 'files' not in summary or 'events' not in summary['files']:
             return jsonify({"error": "No events data found", "status": "waiting_for_data"})
         
-        events_data = load_data_file(summary['files']['events'])
-        return jsonify(events_data)
+        path = summary['files']['events']
+        if 'fields' in request.args:
+            return projected_response('events', summary, 'events', path, lambda: load_data_file(path))
+        return cached_json_response('events', [path], lambda: load_data_file(path))
 
     @app.route('/api/all', methods=['GET', 'OPTIONS'])
+    @profile_route('api_all')
     def api_all():
         """Return all data in a single response"""
         # Handle OPTIONS request for CORS preflight
@@ -205,15 +338,20 @@ def create_app():
             return error_response
         
         try:
-            result = {
-                "summary": summary,
-                "channels": load_data_file(summary['files']['channels']) if 'files' in summary and 'channels' in summary['files'] else [],
-                "roles": load_data_file(summary['files']['roles']) if 'files' in summary and 'roles' in summary['files'] else [],
-                "members": load_data_file(summary['files']['members']) if 'files' in summary and 'members' in summary['files'] else [],
-                "events": load_data_file(summary['files']['events']) if 'files' in summary and 'events' in summary['files'] else []
-            }
+            def build():
+                return {
+                    "summary": summary,
+                    "channels": load_data_file(summary['files']['channels']) if 'files' in summary and 'channels' in summary['files'] else [],
+                    "roles": load_data_file(summary['files']['roles']) if 'files' in summary and 'roles' in summary['files'] else [],
+                    "members": load_members_file(summary['files']['members']) if 'files' in summary and 'members' in summary['files'] else [],
+                    "events": load_data_file(summary['files']['events']) if 'files' in summary and 'events' in summary['files'] else []
+                }
             
-            response = jsonify(result)
+            member_format = 'compact' if request.args.get('format') == 'compact' else 'legacy'
+            if 'fields' in request.args:
+                response = projected_all_response(f'all:{member_format}', summary, build)
+            else:
+                response = cached_json_response(f'all:{member_format}', list(summary.get('files', {}).values()), build)
             response.headers.add('Access-Control-Allow-Origin', '*')
             response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
             response.headers.add('Access-Control-Allow-Methods', 'GET')
@@ -226,95 +364,575 @@ def create_app():
             error_response.headers.add('Access-Control-Allow-Methods', 'GET')
             return error_response
 
+    # Values derived from export files, keyed by the files' (path, mtime, size)
+    # so each snapshot is parsed and processed once per worker
+    snapshot_cache = {}
+    snapshot_cache_lock = threading.Lock()
+    # Key -> lock held while that entry is built, so concurrent requests and the warmup build it once
+    building = {}
+    
+    def cached_for_files(kind, paths, build):
+        """Return build(), reusing the previous result while the given files are unchanged"""
+        try:
+            stats = tuple((p, os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in paths)
+        except OSError:
+            return build()
+        
+        key = (kind, stats)
+        with snapshot_cache_lock:
+            if key in snapshot_cache:
+                return snapshot_cache[key]
+            key_lock = building.setdefault(key, threading.Lock())
+        
+        with key_lock:
+            with snapshot_cache_lock:
+                if key in snapshot_cache:
+                    return snapshot_cache[key]
+            try:
+                value = build()
+                with snapshot_cache_lock:
+                    # Drop results computed for older versions of the same files
+                    for old_key in [k for k in snapshot_cache if k[0] == kind]:
+                        del snapshot_cache[old_key]
+                    snapshot_cache[key] = value
+            finally:
+                with snapshot_cache_lock:
+                    building.pop(key, None)
+            return value
+    
+    def cached_json_response(kind, paths, build):
+        """Return build() as a JSON response, serializing it once per version of the given files"""
+        def serialize():
+            body = app.json.dumps(build()).encode('utf-8')
+            return body, hashlib.sha1(body).hexdigest()
+        
+        body, etag = cached_for_files(f'json:{kind}', paths, serialize)
+        response = app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        return response.make_conditional(request)
+    
+    def cached_file_response(kind, path):
+        """Return a JSON file's bytes as the response, read once per version of the file"""
+        def read():
+            with open(path, 'rb') as f:
+                body = f.read()
+            return body, hashlib.sha1(body).hexdigest()
+        
+        body, etag = cached_for_files(f'file:{kind}', [path], read)
+        response = app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        return response.make_conditional(request)
+    
+    def projected_response(kind, summary, entity, path, load):
+        """Return an entity narrowed to ?fields=
+        
+        Named projections are served from the file the export materialized,
+        or serialized once per file version for older snapshots. Ad hoc field
+        lists are filtered per request from the cached parsed file.
+        """
+        try:
+            name, fields = parse_fields(entity, request.args['fields'])
+        except ValueError as e:
+            return jsonify({"error": str(e), "status": "error"}), 400
+        
+        if name is None:
+            return jsonify(project(cached_for_files(f'data:{kind}', [path], load), fields))
+        
+        materialized = summary.get('projections', {}).get(entity, {}).get(name)
+        # Materialized members use the legacy shape
+        if materialized and os.path.exists(materialized) and not kind.endswith(':compact'):
+            return cached_file_response(f'{kind}:{name}', materialized)
+        return cached_json_response(f'{kind}:{name}', [path], lambda: project(load(), fields))
+    
+    def projected_all_response(kind, summary, build):
+        """Return /api/all with each entity narrowed to ?fields=
+        
+        A projection name applies that entity's field set to each entity; a
+        field list applies to every entity that has the fields.
+        """
+        value = request.args['fields']
+        entities = ('channels', 'roles', 'members', 'events')
+        try:
+            if value in PROJECTIONS['channels']:
+                projections = {e: parse_fields(e, value) for e in entities}
+            else:
+                projections = dict.fromkeys(entities, parse_fields('all', value))
+        except ValueError as e:
+            # api_all adds CORS headers, so return a response object rather than a tuple
+            response = jsonify({"error": str(e), "status": "error"})
+            response.status_code = 400
+            return response
+        
+        def build_projected():
+            data = build()
+            return dict(data, **{e: project(data[e], fields) for e, (_, fields) in projections.items()})
+        
+        paths = list(summary.get('files', {}).values())
+        if projections['channels'][0] is None:
+            return jsonify(build_projected())
+        return cached_json_response(f"{kind}:{projections['channels'][0]}", paths, build_projected)
+    
+    def list_export_files():
+        """Return the sorted export directory listing, re-read only when the directory changes"""
+        return cached_for_files('listing', [EXPORT_DIR], lambda: sorted(os.listdir(EXPORT_DIR)))
+    
+    def count_entities(filepath):
+        """Return the number of records in an export file, or None if unavailable"""
+        def build():
+            return record_count(load_data_file(filepath))
+        return cached_for_files(f'count:{filepath}', [filepath], build)
+    
+    @app.route('/api/view/dashboard')
+    def api_view_dashboard():
+        """Return the precomputed role and member tables used by the dashboard"""
+        summary = get_latest_export()
+        
+        if not summary or 'files' not in summary or 'members' not in summary['files'] or 'roles' not in summary['files']:
+            return jsonify({"error": "No members data found", "status": "waiting_for_data"})
+        
+        roles_path = summary['files']['roles']
+        members_path = summary['files']['members']
+        return cached_json_response('dashboard', [roles_path, members_path], lambda: build_dashboard_view(
+            load_data_file(roles_path), expand_members(load_data_file(members_path))
+        ))
+    
+    # Snapshot IDs are the timestamps in export filenames, e.g. 20250307_102809
+    snapshot_id_pattern = re.compile(r'^\d{8}_\d{6}$')
+    snapshot_entities = ('summary', 'channels', 'roles', 'members', 'events', 'dashboard')
+    
+    def latest_snapshot_id():
+        """Return the ID of the newest summary file, or None"""
+        if not os.path.exists(EXPORT_DIR):
+            return None
+        summaries = [f for f in list_export_files() if f.startswith('summary_') and f.endswith('.json')]
+        return summaries[-1][len('summary_'):-len('.json')] if summaries else None
+    
+    def url_for_snapshot(snapshot_id, entity, **args):
+        return url_for('api_snapshot', snapshot_id=snapshot_id, entity=entity, **args)
+    
+    @app.route('/api/latest')
+    def api_latest():
+        """Point at the newest snapshot's immutable URLs (?entity= redirects to one of them)"""
+        snapshot_id = latest_snapshot_id()
+        if not snapshot_id:
+            return jsonify({"error": "No export data found", "status": "waiting_for_data"})
+        
+        entity = request.args.get('entity')
+        if entity:
+            if entity not in snapshot_entities:
+                return jsonify({"error": f"Unknown entity: {entity}", "status": "error"}), 404
+            args = {k: v for k, v in request.args.items() if k != 'entity'}
+            response = redirect(url_for_snapshot(snapshot_id, entity, **args))
+        else:
+            response = jsonify({
+                "id": snapshot_id,
+                "urls": {e: url_for_snapshot(snapshot_id, e) for e in snapshot_entities}
+            })
+        response.headers['Cache-Control'] = f'public, max-age={LATEST_MAX_AGE}'
+        return response
+    
+    @app.route('/api/snapshots/<snapshot_id>/<entity>')
+    def api_snapshot(snapshot_id, entity):
+        """Serve one entity of a specific snapshot; the response never changes, so it is cached for a year"""
+        summary_path = os.path.join(EXPORT_DIR, f'summary_{snapshot_id}.json')
+        if not snapshot_id_pattern.match(snapshot_id) or not os.path.exists(summary_path):
+            return jsonify({"error": f"Unknown snapshot: {snapshot_id}", "status": "not_found"}), 404
+        
+        try:
+            summary = cached_for_files(f'snapshot_summary:{snapshot_id}', [summary_path], lambda: load_snapshot_file(summary_path))
+            files = summary.get('files', {})
+            needed = {'summary': [], 'dashboard': ['roles', 'members']}.get(entity, [entity])
+            if entity not in snapshot_entities or any(name not in files or not os.path.exists(files[name]) for name in needed):
+                return jsonify({"error": f"No {entity} data in snapshot {snapshot_id}", "status": "not_found"}), 404
+            response = snapshot_entity_response(entity, summary_path, summary)
+        except ValueError as e:
+            print(f"Error loading snapshot {snapshot_id}: {e}")
+            return jsonify({"error": f"Could not read {entity} data of snapshot {snapshot_id}", "status": "error"}), 500
+        
+        # Only real snapshot content is immutable; errors must not be cached by a CDN
+        if response.status_code in (200, 304):
+            response.headers['Cache-Control'] = SNAPSHOT_CACHE_CONTROL
+        return response
+    
+    def load_snapshot_file(path, load=load_data_file):
+        """Load a snapshot file, raising ValueError instead of returning an error placeholder"""
+        data = load(path)
+        if isinstance(data, dict) and 'error' in data:
+            raise ValueError(data['error'])
+        return data
+    
+    def snapshot_entity_response(entity, summary_path, summary):
+        """Build the response for one entity of a snapshot whose files exist"""
+        files = summary.get('files', {})
+        if entity == 'summary':
+            response = cached_json_response('snapshot:summary', [summary_path], lambda: summary)
+        elif entity == 'dashboard':
+            response = cached_json_response('snapshot:dashboard', [files['roles'], files['members']], lambda: build_dashboard_view(
+                load_snapshot_file(files['roles']), expand_members(load_snapshot_file(files['members']))
+            ))
+        elif entity == 'members':
+            if 'offset' in request.args or 'limit' in request.args:
+                response = make_response(members_page(files['members']))
+            else:
+                member_format = 'compact' if request.args.get('format') == 'compact' else 'legacy'
+                if 'fields' in request.args:
+                    response = make_response(projected_response(f'snapshot:members:{member_format}', summary, 'members',
+                                                                files['members'], lambda: load_snapshot_file(files['members'], load_members_file)))
+                else:
+                    response = cached_json_response(f'snapshot:members:{member_format}', [files['members']],
+                                                    lambda: load_snapshot_file(files['members'], load_members_file))
+        else:
+            if 'fields' in request.args:
+                response = make_response(projected_response(f'snapshot:{entity}', summary, entity, files[entity],
+                                                            lambda: load_snapshot_file(files[entity])))
+            else:
+                response = cached_json_response(f'snapshot:{entity}', [files[entity]], lambda: load_snapshot_file(files[entity]))
+        return response
+    
+    @app.route('/api/search')
+    def api_search():
+        """Return ranked full-text matches across members, channels, events and archived messages"""
+        q = request.args.get('q', '').strip()
+        if not q:
+            return jsonify({"error": "Missing search query (?q=)", "status": "error"}), 400
+        
+        try:
+            limit = min(max(1, int(request.args.get('limit', 20))), 100)
+        except ValueError:
+            return jsonify({"error": "limit must be an integer", "status": "error"}), 400
+        
+        start = time.perf_counter()
+        try:
+            results = search_index.search(q, kind=request.args.get('type'), limit=limit)
+        except Exception as e:
+            print(f"Error searching index: {e}")
+            return jsonify({"error": str(e), "status": "error"})
+        
+        return jsonify({
+            "query": q,
+            "results": results,
+            "took_ms": round((time.perf_counter() - start) * 1000, 2)
+        })
+    
+    def read_on_bot_loop(func, *args):
+        """Call func on the local bot's event loop and return its result
+        
+        The live trackers are changed by event handlers on that loop, so a
+        request thread must not iterate them directly.
+        """
+        async def call():
+            return func(*args)
+        
+        future = asyncio.run_coroutine_threadsafe(call(), bot_instance.loop)
+        try:
+            return future.result(timeout=BOT_IPC_TIMEOUT)
+        except TimeoutError:
+            future.cancel()
+            raise bot_ipc.IPCUnavailable("Bot event loop did not answer in time")
+    
+    def read_activity(read):
+        """Apply read to the bot's live activity engine on its loop, or to the last persisted counters"""
+        if local_bot_ready():
+            return read_on_bot_loop(read, activity.engine)
+        return read(cached_for_files('activity', [ACTIVITY_FILE], lambda: activity.load_engine(ACTIVITY_FILE)))
+    
+    @app.route('/api/activity/top')
+    def api_activity_top():
+        """Return the most active channels (?metric=messages|voice_seconds&window=hour|day|week|month)"""
+        metric = request.args.get('metric', 'messages')
+        window = request.args.get('window', 'day')
+        try:
+            limit = min(max(1, int(request.args.get('limit', 10))), 100)
+            if BOT_IPC_SOCKET and bot_instance is None:
+                return jsonify(bot_ipc.query('activity_top', {'metric': metric, 'window': window, 'limit': limit}))
+            
+            channels = read_activity(lambda engine: engine.top_channels(metric, window, limit))
+            return jsonify({"metric": metric, "window": window, "channels": channels})
+        except ValueError as e:
+            return jsonify({"error": str(e), "status": "error"}), 400
+        except bot_ipc.IPCUnavailable as e:
+            print(f"Error reaching bot process: {e}")
+            return jsonify({"error": "Bot not connected", "status": "offline"})
+    
+    @app.route('/api/activity/heatmap')
+    def api_activity_heatmap():
+        """Return an hour-of-week heatmap (7 x 24, UTC) for the guild or one ?channel_id="""
+        metric = request.args.get('metric', 'messages')
+        channel_id = request.args.get('channel_id')
+        try:
+            if BOT_IPC_SOCKET and bot_instance is None:
+                return jsonify(bot_ipc.query('activity_heatmap', {'metric': metric, 'channel_id': channel_id}))
+            
+            heatmap = read_activity(lambda engine: engine.heatmap(metric, int(channel_id) if channel_id else None))
+            return jsonify({"metric": metric, "channel_id": channel_id, "heatmap": heatmap})
+        except ValueError as e:
+            return jsonify({"error": str(e), "status": "error"}), 400
+        except bot_ipc.IPCUnavailable as e:
+            print(f"Error reaching bot process: {e}")
+            return jsonify({"error": "Bot not connected", "status": "offline"})
+    
+    @app.route('/api/presence/online')
+    def api_presence_online():
+        """Return the members online right now, from the bot's presence tracker"""
+        if not PRESENCE_TRACKING:
+            return jsonify({"error": "Presence tracking is disabled (set PRESENCE_TRACKING=true)", "status": "unavailable"})
+        
+        try:
+            if local_bot_ready():
+                members = read_on_bot_loop(presence.tracker.online_now)
+                return jsonify({"count": len(members), "members": members})
+            if BOT_IPC_SOCKET and bot_instance is None:
+                return jsonify(bot_ipc.query('presence_online'))
+            return jsonify({"error": "Bot not connected", "status": "offline"})
+        except bot_ipc.IPCUnavailable as e:
+            print(f"Error reaching bot process: {e}")
+            return jsonify({"error": "Bot not connected", "status": "offline"})
+    
+    @app.route('/api/presence/peaks')
+    def api_presence_peaks():
+        """Return the peak online member count per UTC day (?days=, newest first)"""
+        try:
+            days = min(max(1, int(request.args.get('days', 30))), 366)
+        except ValueError:
+            return jsonify({"error": "days must be an integer", "status": "error"}), 400
+        
+        try:
+            if local_bot_ready():
+                return jsonify({"peaks": read_on_bot_loop(presence.tracker.peaks, days)})
+            if BOT_IPC_SOCKET and bot_instance is None:
+                return jsonify(bot_ipc.query('presence_peaks', {'days': days}))
+        except bot_ipc.IPCUnavailable as e:
+            print(f"Error reaching bot process: {e}")
+        
+        # No live tracker reachable: serve the last persisted peaks
+        peaks = cached_for_files('presence_peaks', [PRESENCE_PEAKS_FILE], lambda: presence.load_peaks(PRESENCE_PEAKS_FILE))
+        return jsonify({"peaks": peaks.peaks(days)})
+    
+    @app.route('/api/voice/history')
+    def api_voice_history():
+        """Return hourly voice occupancy and average session length per channel (?hours=&channel_id=)"""
+        try:
+            hours = min(max(1, int(request.args.get('hours', 24))), 168)
+            channel_id = int(request.args['channel_id']) if request.args.get('channel_id') else None
+        except ValueError:
+            return jsonify({"error": "hours and channel_id must be integers", "status": "error"}), 400
+        
+        try:
+            if local_bot_ready():
+                return jsonify(read_on_bot_loop(voice.tracker.history, hours, channel_id))
+            if BOT_IPC_SOCKET and bot_instance is None:
+                return jsonify(bot_ipc.query('voice_history', {'hours': hours, 'channel_id': channel_id}))
+        except bot_ipc.IPCUnavailable as e:
+            print(f"Error reaching bot process: {e}")
+        
+        # No live tracker reachable: rebuild from the session log
+        tracker = cached_for_files('voice_sessions', [VOICE_SESSION_LOG], lambda: voice.load_sessions(VOICE_SESSION_LOG))
+        return jsonify(tracker.history(hours, channel_id))
+    
+    @app.route('/api/analytics/members')
+    def api_analytics_members():
+        """Return member aggregates computed from the latest columnar snapshot"""
+        # Imported on first use so numpy stays out of worker startup
+        from src import columnar
+        path = columnar.latest_columnar_path()
+        
+        if columnar.np is None or not path:
+            return jsonify({"error": "No columnar member snapshot found (set COLUMNAR_EXPORT=true and install numpy)", "status": "unavailable"})
+        
+        try:
+            members = columnar.MemberColumns(path)
+            result = {
+                "snapshot": os.path.basename(path),
+                "member_count": len(members),
+                "bot_ratio": members.bot_ratio(),
+                "status_breakdown": members.status_breakdown(),
+                "joins_per_week": members.joins_per_week(),
+                "role_member_counts": members.role_member_counts(),
+            }
+            if request.args.get('overlap') == '1':
+                roles, matrix = members.role_overlap()
+                result["role_overlap"] = {"roles": roles, "matrix": matrix}
+            return jsonify(result)
+        except Exception as e:
+            print(f"Error reading columnar snapshot: {e}")
+            return jsonify({"error": str(e), "status": "error"})
+    
+    @app.route('/api/counts')
+    def api_counts():
+        """Return record counts for the latest export without the records themselves"""
+        summary = get_latest_export()
+        
+        if not summary:
+            return jsonify({"error": "No export data found", "status": "waiting_for_data"})
+        
+        files = summary.get('files', {})
+        response = jsonify({
+            "server_name": summary.get('server_name'),
+            "export_time": summary.get('export_time'),
+            "counts": {entity: count_entities(path) for entity, path in files.items()}
+        })
+        
+        # Pollers send If-None-Match and get an empty 304 until a new export lands
+        response.add_etag()
+        return response.make_conditional(request)
+    
+    # Last computed health status and when it expires
+    health_cache = {"expires": 0, "status": None}
+    
+    def bot_status():
+        """Return the bot's connection state without linking or starting a bot"""
+        if bot_instance is not None:
+            connected = bot_instance.is_ready()
+            return {
+                "mode": "local",
+                "connected": connected,
+                "latency_ms": latency_ms(bot_instance.latency) if connected else None,
+                "sharding": shard_report(bot_instance) if connected else None
+            }
+        
+        if BOT_IPC_SOCKET:
+            try:
+                status = bot_ipc.query('status', timeout=min(BOT_IPC_TIMEOUT, 1))
+                return {"mode": "ipc", "connected": status.get('connected', False), "latency_ms": status.get('latency_ms'),
+                        "sharding": status.get('sharding')}
+            except bot_ipc.IPCUnavailable:
+                return {"mode": "ipc", "connected": False, "latency_ms": None}
+        
+        return {"mode": SERVE_MODE, "connected": False, "latency_ms": None}
+    
+    def snapshot_status():
+        """Describe the latest snapshot: its ID, age and how long its export took"""
+        summaries = [f for f in list_export_files() if f.startswith('summary_') and f.endswith('.json')]
+        if not summaries:
+            return None
+        
+        latest = summaries[-1]
+        summary = get_latest_export() or {}
+        return {
+            "id": latest[len('summary_'):-len('.json')],
+            "export_time": summary.get('export_time'),
+            "age_seconds": round(time.time() - os.path.getmtime(os.path.join(EXPORT_DIR, latest))),
+            "export_duration_seconds": summary.get('export_duration_seconds')
+        }
+    
     @app.route('/api/health')
     def api_health():
-        """Health check endpoint"""
+        """Health check endpoint (constant-size; see /api/admin/files for the file listing)"""
+        now = time.monotonic()
+        if health_cache['status'] is None or now >= health_cache['expires']:
+            export_dir_exists = os.path.exists(EXPORT_DIR)
+            bot = bot_status()
+            health_cache['status'] = {
+                "status": "ok",
+                "version": "1.0.0",
+                "bot_running": bot['connected'],
+                "bot": bot,
+                "export_dir_exists": export_dir_exists,
+                "file_count": len(list_export_files()) if export_dir_exists else 0,
+                "snapshot": snapshot_status() if export_dir_exists else None,
+                "realtime_cache": realtime_cache.snapshot()
+            }
+            health_cache['expires'] = now + HEALTH_CACHE_TTL
+        
+        return jsonify(health_cache['status'])
+    
+    @app.route('/api/admin/files')
+    def api_admin_files():
+        """List export files page by page, newest first (requires the admin token)"""
+        if not is_admin_request(request):
+            return jsonify({"status": "error", "message": "Admin token required"}), 403
+        
+        try:
+            offset = max(0, int(request.args.get('offset', 0)))
+            limit = min(max(0, int(request.args.get('limit', 100))), 1000)
+        except ValueError:
+            return jsonify({"error": "offset and limit must be integers", "status": "error"}), 400
+        
+        names = list_export_files()[::-1] if os.path.exists(EXPORT_DIR) else []
+        files = []
+        for name in names[offset:offset + limit]:
+            try:
+                stat = os.stat(os.path.join(EXPORT_DIR, name))
+            except OSError:
+                # Replaced or deleted since the listing was read
+                continue
+            files.append({
+                "name": name,
+                "size": stat.st_size,
+                "modified": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+            })
+        
+        return jsonify({"total": len(names), "offset": offset, "limit": limit, "files": files})
+
+    @app.route('/api/live')
+    def api_live():
+        """Liveness probe: the process is up and answering requests"""
+        return jsonify({"status": "alive"})
+    
+    @app.route('/api/ready')
+    def api_ready():
+        """Readiness probe: 503 until the startup warmup has loaded the latest snapshot"""
+        if not warmup_state['ready']:
+            return jsonify({"status": "warming_up", "started_at": warmup_state['started_at']}), 503
+        
         return jsonify({
-            "status": "ok", 
-            "version": "1.0.0",
-            "bot_running": bot_started,
-            "export_dir_exists": os.path.exists(EXPORT_DIR),
-            "export_files": os.listdir(EXPORT_DIR) if os.path.exists(EXPORT_DIR) else []
+            "status": "ready",
+            "snapshot": warmup_state['snapshot'],
+            "warmup_seconds": warmup_state['duration'],
+            "warmed": warmup_state['warmed']
         })
 
-    @app.route('/api/realtime')
-    def api_realtime():
-        """Return real-time data about online members and active channels"""
-        global bot_instance
+    @app.route('/api/admin/rest')
+    def api_admin_rest():
+        """Report the bot's Discord REST scheduler metrics (requires the admin token)"""
+        if not is_admin_request(request):
+            return jsonify({"status": "error", "message": "Admin token required"}), 403
         
-        if not bot_instance or not bot_instance.guilds:
+        try:
+            if local_bot_ready():
+                return jsonify(read_on_bot_loop(rest_scheduler.metrics))
+            if BOT_IPC_SOCKET and bot_instance is None:
+                return jsonify(bot_ipc.query('rest_metrics'))
             return jsonify({"error": "Bot not connected", "status": "offline"})
-            
-        guild = bot_instance.guilds[0]
-        
-        try:
-            # Get online members
-            online_members = []
-            for member in guild.members:
-                if hasattr(member, 'status') and str(member.status) != 'offline':
-                    online_members.append({
-                        'id': member.id,
-                        'name': member.name,
-                        'display_name': member.display_name,
-                        'avatar_url': str(member.display_avatar.url) if hasattr(member, 'display_avatar') else None,
-                        'status': str(member.status) if hasattr(member, 'status') else 'unknown'
-                    })
-            
-            # Get active channels (channels with recent messages)
-            active_channels = []
-            for channel in guild.text_channels:
-                try:
-                    # Try to get the last message timestamp
-                    last_message = None
-                    async def get_last_message():
-                        nonlocal last_message
-                        messages = [msg async for msg in channel.history(limit=1)]
-                        if messages:
-                            last_message = messages[0]
-                    
-                    # Create a new event loop for the async call
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    loop.run_until_complete(get_last_message())
-                    loop.close()
-                    
-                    if last_message:
-                        active_channels.append({
-                            'id': channel.id,
-                            'name': channel.name,
-                            'last_message_time': last_message.created_at.isoformat(),
-                            'category': channel.category.name if channel.category else None
-                        })
-                except Exception as e:
-                    print(f"Error getting last message for channel {channel.name}: {e}")
-            
-            # Sort active channels by last message time (most recent first)
-            active_channels.sort(key=lambda x: x.get('last_message_time', ''), reverse=True)
-            
-            # Get voice channels with members
-            active_voice_channels = []
-            for channel in guild.voice_channels:
-                if len(channel.members) > 0:
-                    active_voice_channels.append({
-                        'id': channel.id,
-                        'name': channel.name,
-                        'member_count': len(channel.members),
-                        'members': [{'id': m.id, 'name': m.display_name} for m in channel.members]
-                    })
-            
-            return jsonify({
-                'timestamp': datetime.now().isoformat(),
-                'guild_name': guild.name,
-                'guild_id': guild.id,
-                'total_members': guild.member_count,
-                'online_members': online_members,
-                'active_text_channels': active_channels,
-                'active_voice_channels': active_voice_channels
-            })
-            
+        except bot_ipc.IPCUnavailable as e:
+            print(f"Error reaching bot process: {e}")
+            return jsonify({"error": "Bot not connected", "status": "offline"})
+
+    def local_bot_ready():
+        """Check whether a bot running in this process is connected"""
+        bot = get_bot()
+        return bot is not None and bot.is_ready()
+    
+    # Every dashboard and widget polls /api/realtime; they share one computation per TTL
+    realtime_cache = MicroCache(REALTIME_CACHE_TTL, REALTIME_STALE_TTL)
+    
+    def compute_realtime():
+        """Collect real-time data from the bot and serialize it once for all pollers"""
+        try:
+            if local_bot_ready():
+                # Discord objects belong to the bot's event loop, so run the collection there
+                future = asyncio.run_coroutine_threadsafe(collect_realtime(bot_instance), bot_instance.loop)
+                data = future.result(timeout=BOT_IPC_TIMEOUT)
+            elif BOT_IPC_SOCKET:
+                data = bot_ipc.query('realtime')
+            else:
+                data = {"error": "Bot not connected", "status": "offline"}
+        except bot_ipc.IPCUnavailable as e:
+            print(f"Error reaching bot process: {e}")
+            data = {"error": "Bot not connected", "status": "offline"}
         except Exception as e:
             print(f"Error getting real-time data: {e}")
-            return jsonify({"error": str(e), "status": "error"})
+            data = {"error": str(e), "status": "error"}
+        return app.json.dumps(data).encode('utf-8')
+    
+    @app.route('/api/realtime')
+    @profile_route('api_realtime')
+    def api_realtime():
+        """Return real-time data about online members and active channels"""
+        body, state = realtime_cache.get('realtime', compute_realtime)
+        response = app.response_class(body, mimetype='application/json')
+        response.headers['X-Cache'] = state.upper()
+        return response
 
     @app.route('/api/cors', methods=['GET', 'OPTIONS'])
     def handle_cors():
@@ -350,22 +968,17 @@ def create_app():
         
         if file:
             try:
-                # Save the zip file temporarily
-                zip_path = os.path.join(os.path.dirname(EXPORT_DIR), 'temp.zip')
-                file.save(zip_path)
-                
-                # Extract the zip file to the server_data directory
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    zip_ref.extractall(os.path.dirname(EXPORT_DIR))
-                
-                # Remove the temporary zip file
-                os.remove(zip_path)
+                # Read the archive straight from the request stream instead of copying it to temp.zip;
+                # entries stored under server_data/ are mapped into EXPORT_DIR
+                files = uploads.extract_and_publish(file.stream, strip_prefix=f"{os.path.basename(EXPORT_DIR)}/")
                 
                 return jsonify({
                     "status": "success", 
                     "message": "Data uploaded and extracted successfully",
-                    "files": os.listdir(EXPORT_DIR)
+                    "files": files
                 })
+            except uploads.UploadError as e:
+                return jsonify({"status": "error", "message": str(e)}), 400
             except Exception as e:
                 return jsonify({"status": "error", "message": str(e)}), 500
     
@@ -400,10 +1013,98 @@ def create_app():
                 print(f"Error uploading file: {e}")
                 return jsonify({"status": "error", "message": str(e)}), 500
     
+    @app.route('/api/bulk/start', methods=['POST'])
+    @admin_required
+    def api_bulk_start():
+        """Start or resume a chunked snapshot archive upload"""
+        data = request.get_json(silent=True) or {}
+        try:
+            status = uploads.start_upload(data.get('sha256'), data.get('size'), data.get('chunk_size'))
+            return jsonify({"status": "success", **status})
+        except uploads.UploadError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+    
+    @app.route('/api/bulk/<upload_id>', methods=['GET'])
+    @admin_required
+    def api_bulk_status(upload_id):
+        """Report which chunks of an upload have been received"""
+        try:
+            return jsonify({"status": "success", **uploads.upload_status(upload_id)})
+        except uploads.UploadError as e:
+            return jsonify({"status": "error", "message": str(e)}), 404
+    
+    @app.route('/api/bulk/<upload_id>/chunks/<int:index>', methods=['PUT'])
+    @admin_required
+    def api_bulk_chunk(upload_id, index):
+        """Store one checksummed chunk of an upload"""
+        try:
+            uploads.store_chunk(upload_id, index, request.get_data(), request.headers.get('X-Chunk-SHA256'))
+            return jsonify({"status": "success", "index": index})
+        except uploads.UploadError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+    
+    @app.route('/api/bulk/<upload_id>/commit', methods=['POST'])
+    @admin_required
+    def api_bulk_commit(upload_id):
+        """Verify a completed upload and publish its snapshot"""
+        try:
+            files = uploads.commit_upload(upload_id)
+            print(f"Published {len(files)} files from bulk upload {upload_id[:12]}")
+            return jsonify({"status": "success", "message": "Snapshot published", "files": files})
+        except uploads.UploadError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        except Exception as e:
+            print(f"Error committing bulk upload: {e}")
+            return jsonify({"status": "error", "message": str(e)}), 500
+    
+    @app.route('/api/sync/manifest', methods=['POST'])
+    @admin_required
+    def api_sync_manifest():
+        """Report which files of a client manifest the server is missing"""
+        data = request.get_json(silent=True) or {}
+        files = data.get('files')
+        
+        if not isinstance(files, dict):
+            return jsonify({"status": "error", "message": "Expected {'files': {name: sha256}}"}), 400
+        
+        try:
+            return jsonify({"status": "success", **uploads.diff_manifest(files)})
+        except uploads.UploadError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+    
+    @app.route('/api/sync/signatures/<name>')
+    @admin_required
+    def api_sync_signatures(name):
+        """Return chunk signatures of an export file for delta uploads"""
+        try:
+            return jsonify({"status": "success", **uploads.file_signatures(name)})
+        except uploads.UploadError as e:
+            return jsonify({"status": "error", "message": str(e)}), 404
+    
+    @app.route('/api/sync/delta', methods=['POST'])
+    @admin_required
+    def api_sync_delta():
+        """Rebuild a file from a delta against an existing export file"""
+        data = request.get_json(silent=True) or {}
+        try:
+            size = uploads.store_delta(data.get('name'), data.get('base'), data.get('sha256'), data.get('ops') or [])
+            print(f"Rebuilt {data.get('name')} ({size} bytes) from delta against {data.get('base')}")
+            return jsonify({"status": "success", "name": data.get('name'), "size": size})
+        except uploads.UploadError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+    
     @app.route('/api/trigger_export', methods=['POST'])
     def api_trigger_export():
         """Trigger a Discord data export"""
         try:
+            if SERVE_MODE == 'snapshot' and not BOT_IPC_SOCKET:
+                return jsonify({"status": "error", "message": "Exports are unavailable in snapshot-only mode"}), 503
+            
+            if BOT_IPC_SOCKET and not local_bot_ready():
+                # Let the process that owns the bot run the export
+                result = bot_ipc.query('export')
+                return jsonify(result), (200 if result.get('status') == 'success' else 500)
+            
             # Import here to avoid circular imports
             import importlib
             commands_module = importlib.import_module('src.commands')
@@ -413,6 +1114,14 @@ def create_app():
                 async def send(self, message):
                     print(f"API Export: {message}")
             
+            if local_bot_ready():
+                # Run on the bot's own event loop; the export outlives this request
+                asyncio.run_coroutine_threadsafe(commands_module.export_server_data(DummyContext()), bot_instance.loop)
+                return jsonify({
+                    "status": "success",
+                    "message": "Export triggered successfully on the bot event loop"
+                })
+            
             # Create a background thread to run the export
             def run_export():
                 asyncio.run(commands_module.export_server_data(DummyContext()))
@@ -429,6 +1138,66 @@ def create_app():
             print(f"Error triggering export: {e}")
             return jsonify({"status": "error", "message": str(e)}), 500
     
+    # Responses requested during warmup, so the first real client hits hot caches
+    warmup_paths = [
+        '/', '/api/summary', '/api/counts', '/api/channels', '/api/roles', '/api/events',
+        '/api/members', '/api/members?format=compact', '/api/view/dashboard', '/api/all'
+    ]
+    warmup_state = {"ready": not WARMUP_ENABLED, "started_at": None, "duration": None, "snapshot": None, "warmed": []}
+    warmup_lock = threading.Lock()
+    
+    def warm_up():
+        """Load the latest snapshot, open its member index and pre-serialize the hot responses"""
+        with warmup_lock:
+            start = time.perf_counter()
+            warmup_state['started_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            warmed = []
+            try:
+                summary = get_latest_export()
+                if summary:
+                    members_path = summary.get('files', {}).get('members')
+                    if members_path and os.path.exists(members_path):
+                        get_indexed_members(members_path)
+                    
+                    client = app.test_client()
+                    for path in warmup_paths:
+                        client.get(path)
+                        warmed.append(path)
+                    warmup_state['snapshot'] = summary.get('export_time')
+            except Exception as e:
+                print(f"Error during warmup: {e}")
+            finally:
+                warmup_state['warmed'] = warmed
+                warmup_state['duration'] = round(time.perf_counter() - start, 3)
+                warmup_state['ready'] = True
+                print(f"Warmup finished in {warmup_state['duration']}s ({len(warmed)} responses cached)")
+    
+    def start_warmup():
+        """Run the warmup in the background so the worker can answer /api/live meanwhile"""
+        if WARMUP_ENABLED:
+            threading.Thread(target=warm_up, daemon=True).start()
+    
+    def index_published_snapshot():
+        """Index a snapshot this worker has just published from an upload"""
+        try:
+            summary = get_latest_export()
+            if summary:
+                search_index.update_index(summary)
+        except Exception as e:
+            print(f"Error indexing published snapshot: {e}")
+    
+    @app.after_request
+    def rewarm_after_publish(response):
+        """Re-index and re-warm the caches once an upload has published a new snapshot"""
+        if request.method == 'POST' and response.status_code == 200 and request.endpoint in (
+                'api_upload_data', 'api_upload_file', 'api_bulk_commit', 'api_sync_delta'):
+            # Only the worker that handled the upload writes the index; exports index in the bot process
+            threading.Thread(target=index_published_snapshot, daemon=True).start()
+            start_warmup()
+        return response
+    
+    start_warmup()
+    
     return app
 
 # Global app instance for running directly
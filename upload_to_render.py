@@ -1,12 +1,42 @@
 import os
+import sys
 import requests
 import json
-import shutil
+import time
+import hashlib
+import tempfile
+import zipfile
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.sync import file_sha256, compute_delta
 
 # Configuration
 RENDER_API_URL = "https://discord-to-site-api.onrender.com"
 SERVER_DATA_DIR = "server_data"
+CHUNK_SIZE = 1024 * 1024  # 1 MB per chunk
+DELTA_MIN_BYTES = 64 * 1024  # Smaller files are cheaper to send whole
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')  # Required by the bulk and sync endpoints
+
+_session = None
+
+def get_session():
+    """Return a pooled HTTP session that retries transient failures"""
+    global _session
+    if _session is None:
+        retry = Retry(
+            total=5,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504],
+            # Chunk PUTs and GETs are idempotent; POSTs are not retried, since a repeated commit could publish twice
+            allowed_methods=['GET', 'PUT'],
+        )
+        _session = requests.Session()
+        if ADMIN_TOKEN:
+            _session.headers['X-Admin-Token'] = ADMIN_TOKEN
+        _session.mount('https://', HTTPAdapter(max_retries=retry, pool_maxsize=4))
+        _session.mount('http://', HTTPAdapter(max_retries=retry, pool_maxsize=4))
+    return _session
 
 def create_server_data_directory():
     """Create a server_data directory on Render by making an API call"""
@@ -43,8 +73,171 @@ def upload_files():
         except Exception as e:
             print(f"Error uploading {file_path.name}: {e}")
 
+def build_snapshot_archive(file_paths, archive_path):
+    """Pack files into a compressed zip archive
+    
+    Entries are sorted and stamped with their modification time, so packing the
+    same files twice produces an identical archive (and therefore the same upload ID).
+    """
+    with zipfile.ZipFile(archive_path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=9) as archive:
+        for file_path in sorted(set(str(p) for p in file_paths)):
+            info = zipfile.ZipInfo(os.path.basename(file_path))
+            mtime = max(os.path.getmtime(file_path), 315532800)  # Zip timestamps start in 1980
+            info.date_time = time.localtime(mtime)[:6]
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with open(file_path, 'rb') as f:
+                archive.writestr(info, f.read())
+    
+    digest = hashlib.sha256()
+    with open(archive_path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest(), os.path.getsize(archive_path)
+
+def bulk_upload(file_paths, api_url=None):
+    """Upload files as one archive in resumable, checksummed chunks
+    
+    Returns True once the server has verified and published the snapshot.
+    Re-running after an interruption only sends the chunks the server is missing.
+    """
+    api_url = api_url or RENDER_API_URL
+    session = get_session()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        archive_path = os.path.join(tmp_dir, 'snapshot.zip')
+        sha256, size = build_snapshot_archive(file_paths, archive_path)
+        print(f"Packed {len(file_paths)} files into {size} bytes (sha256 {sha256[:12]})")
+        
+        try:
+            response = session.post(f"{api_url}/api/bulk/start", json={
+                'sha256': sha256,
+                'size': size,
+                'chunk_size': CHUNK_SIZE,
+            })
+            if response.status_code != 200:
+                print(f"Failed to start bulk upload: {response.status_code} - {response.text}")
+                return False
+            
+            status = response.json()
+            received = set(status.get('received', []))
+            total_chunks = status['total_chunks']
+            if received:
+                print(f"Resuming upload: {len(received)}/{total_chunks} chunks already on the server")
+            
+            with open(archive_path, 'rb') as archive:
+                for index in range(total_chunks):
+                    if index in received:
+                        continue
+                    
+                    archive.seek(index * CHUNK_SIZE)
+                    chunk = archive.read(CHUNK_SIZE)
+                    response = session.put(
+                        f"{api_url}/api/bulk/{sha256}/chunks/{index}",
+                        data=chunk,
+                        headers={
+                            'Content-Type': 'application/octet-stream',
+                            'X-Chunk-SHA256': hashlib.sha256(chunk).hexdigest(),
+                        },
+                    )
+                    if response.status_code != 200:
+                        print(f"Failed to upload chunk {index}: {response.status_code} - {response.text}")
+                        return False
+                    print(f"Uploaded chunk {index + 1}/{total_chunks}")
+            
+            response = session.post(f"{api_url}/api/bulk/{sha256}/commit")
+            if response.status_code != 200:
+                print(f"Failed to commit bulk upload: {response.status_code} - {response.text}")
+                return False
+            
+            print(f"Snapshot published: {response.json().get('files')}")
+            return True
+        except Exception as e:
+            print(f"Error during bulk upload: {e}")
+            return False
+
+def send_delta(session, api_url, file_path, base):
+    """Send a file as a delta against a base file the server already has
+    
+    Returns True if the server rebuilt the file, False if it should be sent whole.
+    """
+    name = os.path.basename(file_path)
+    response = session.get(f"{api_url}/api/sync/signatures/{base}")
+    if response.status_code != 200:
+        return False
+    
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    
+    ops, literal_bytes = compute_delta(data, response.json()['signatures'])
+    if literal_bytes > len(data) // 2:
+        # Too little in common with the base for a delta to pay off
+        return False
+    
+    response = session.post(f"{api_url}/api/sync/delta", json={
+        'name': name,
+        'base': base,
+        'sha256': hashlib.sha256(data).hexdigest(),
+        'ops': ops,
+    })
+    if response.status_code != 200:
+        print(f"Delta upload of {name} failed: {response.status_code} - {response.text}")
+        return False
+    
+    print(f"Sent {name} as a delta against {base}: {literal_bytes} of {len(data)} bytes transferred")
+    return True
+
+def sync_snapshot(file_paths, api_url=None):
+    """Upload only the files the server is missing, using deltas for large files
+    
+    Data files are sent first and everything else goes through bulk_upload,
+    so summary files are still published last.
+    """
+    api_url = api_url or RENDER_API_URL
+    session = get_session()
+    paths = {os.path.basename(str(p)): str(p) for p in file_paths}
+    
+    try:
+        response = session.post(f"{api_url}/api/sync/manifest", json={
+            'files': {name: file_sha256(path) for name, path in paths.items()}
+        })
+        if response.status_code != 200:
+            print(f"Manifest exchange failed: {response.status_code} - {response.text}")
+            return bulk_upload(list(paths.values()), api_url=api_url)
+        
+        diff = response.json()
+        missing = diff.get('missing', [])
+        bases = diff.get('bases', {})
+        print(f"Server is missing {len(missing)} of {len(paths)} files")
+        
+        if not missing:
+            print("Remote is already up to date")
+            return True
+        
+        remaining = []
+        for name in missing:
+            path = paths[name]
+            is_data_file = not name.startswith('summary_')
+            if is_data_file and name in bases and os.path.getsize(path) >= DELTA_MIN_BYTES:
+                if send_delta(session, api_url, path, bases[name]):
+                    continue
+            remaining.append(path)
+        
+        if not remaining:
+            return True
+        return bulk_upload(remaining, api_url=api_url)
+    except Exception as e:
+        print(f"Error during sync: {e}")
+        return False
+
 if __name__ == "__main__":
     print("Starting data upload to Render...")
-    create_server_data_directory()
-    upload_files()
+    # Member offset indexes (*.json.idx) let the server page members without parsing them
+    snapshot_files = list(Path(SERVER_DATA_DIR).glob("*.json")) + list(Path(SERVER_DATA_DIR).glob("*.json.idx"))
+    if '--sync' in sys.argv:
+        sync_snapshot(snapshot_files)
+    elif '--bulk' in sys.argv:
+        bulk_upload(snapshot_files)
+    else:
+        create_server_data_directory()
+        upload_files()
     print("Upload process completed")